@@ -0,0 +1,201 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import traceback
+
+import numpy as np
+
+import build
+import scoring
+import screening
+from case_study import COMPANY, build_document
+
+
+def load_manifest(path):
+    # Either a JSON array of scenarios or JSON Lines, one scenario per line.
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        scenarios = json.loads(text)
+    else:
+        scenarios = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for i, sc in enumerate(scenarios):
+        sc.setdefault("id", f"scenario-{i + 1:05d}")
+    return scenarios
+
+
+def scenario_weights(spec):
+    # Scaled to sum to 1, so weighted totals stay on the 1-5 scale the
+    # documents label them with.
+    if spec is None:
+        return scoring.WEIGHTS
+    if isinstance(spec, dict):
+        unknown = set(spec) - set(scoring.CRITERIA)
+        if unknown:
+            raise ValueError(f"unknown criteria: {', '.join(sorted(unknown))}")
+        missing = [c for c in scoring.CRITERIA if c not in spec]
+        if missing:
+            raise ValueError(f"no weight for: {', '.join(missing)}")
+        weights = np.array([float(spec[c]) for c in scoring.CRITERIA])
+    else:
+        weights = np.asarray(spec, dtype=float)
+        if weights.shape != (len(scoring.CRITERIA),):
+            raise ValueError(f"expected {len(scoring.CRITERIA)} weights, got {weights.size}")
+    if not np.isfinite(weights).all() or (weights < 0).any():
+        raise ValueError("weights must be finite and non-negative")
+    total = weights.sum()
+    if total <= 0:
+        raise ValueError("weights must not all be zero")
+    return weights / total
+
+
+def scenario_countries(names):
+    if names is None:
+        return scoring.COUNTRIES, scoring.SCORES
+    if not isinstance(names, (list, tuple)) or not all(isinstance(n, str) for n in names):
+        raise TypeError("countries must be a list of country names")
+    if not names:
+        raise ValueError("countries must name at least one country")
+    index = {c: i for i, c in enumerate(scoring.COUNTRIES)}
+    unknown = [n for n in names if n not in index]
+    if unknown:
+        raise ValueError(f"no scores for: {', '.join(unknown)}")
+    rows = [index[n] for n in names]
+    return tuple(names), scoring.SCORES[rows]
+
+
+def scenario_funnel(spec, screen):
+    # screen is (indicator table, thresholds) from --screen/--threshold; a
+    # scenario's own "thresholds" override those for its run.
+    if screen is None:
+        if spec:
+            raise ValueError("scenario thresholds need an indicator table (--screen CSV)")
+        return None
+    table, thresholds = screen
+    return screening.run_funnel(table, thresholds={**thresholds, **screening.check_thresholds(spec or {})})
+
+
+def scenario_company(name):
+    if not isinstance(name, str):
+        raise TypeError("company must be a string")
+    if not name.strip():
+        raise ValueError("company must not be empty")
+    return name
+
+
+def scenario_document(scenario, screen=None):
+    countries, matrix = scenario_countries(scenario.get("countries"))
+    return build_document(
+        weights=scenario_weights(scenario.get("weights")),
+        countries=countries, matrix=matrix,
+        funnel=scenario_funnel(scenario.get("thresholds"), screen),
+        company=scenario_company(scenario.get("company", COMPANY)),
+        modes=scenario.get("entry_modes"),
+    )
+
+
+def safe_name(text):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(text)).strip("_") or "scenario"
+
+
+def check_names(scenarios):
+    # Two ids that clean up to the same name would write the same files.
+    # Compared case-insensitively for case-insensitive file systems.
+    seen = {}
+    for sc in scenarios:
+        name = safe_name(sc["id"])
+        if name.lower() in seen:
+            raise ValueError(f"scenarios {seen[name.lower()]!r} and {sc['id']!r} would both write to {name!r}")
+        seen[name.lower()] = sc["id"]
+
+
+def render_scenario(scenario, out_dir, formats, screen=None):
+    start = time.perf_counter()
+    name = safe_name(scenario["id"])
+    document = scenario_document(scenario, screen)
+    target = os.path.join(out_dir, name)
+    os.makedirs(target, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(target, build.file_name(name, fmt))
+        build.atomic_render(build.renderer(fmt), document, path)
+        paths.append(path)
+    return paths, time.perf_counter() - start
+
+
+def run_batch(scenarios, out_dir, formats=None, workers=None, screen=None):
+    formats = list(formats or build.RENDERERS)
+    check_names(scenarios)
+    os.makedirs(out_dir, exist_ok=True)
+    failures = []
+    done = 0
+    start = time.perf_counter()
+
+    # Each worker imports reportlab/python-docx/python-pptx once and then
+    # renders many scenarios, instead of paying that import per report.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(render_scenario, sc, out_dir, formats, screen): sc for sc in scenarios}
+        for future in as_completed(futures):
+            sc = futures[future]
+            done += 1
+            try:
+                _, seconds = future.result()
+                status = f"ok {seconds*1000:.0f} ms"
+            except Exception as exc:
+                failures.append({
+                    "id": sc["id"],
+                    "error": f"{type(exc).__name__}: {exc}",
+                    "traceback": "".join(traceback.format_exception(exc)),
+                })
+                status = f"FAILED {type(exc).__name__}: {exc}"
+            print(f"[{done}/{len(scenarios)}] {sc['id']} {status}", flush=True)
+
+    elapsed = time.perf_counter() - start
+    report = os.path.join(out_dir, "failures.json")
+    if failures:
+        with open(report, "w", encoding="utf-8") as f:
+            json.dump(failures, f, indent=1)
+    elif os.path.exists(report):
+        os.remove(report)
+
+    ok = len(scenarios) - len(failures)
+    rate = len(scenarios) / elapsed if elapsed else 0.0
+    print(f"{ok} ok, {len(failures)} failed in {elapsed:.1f} s ({rate:.1f} scenarios/s)")
+    if failures:
+        print(f"failure report: {report}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render one report per scenario in a manifest.")
+    parser.add_argument("manifest", help="JSON array or JSON Lines file of scenarios")
+    parser.add_argument("-o", "--out-dir", default="reports")
+    parser.add_argument("-f", "--format", action="append", choices=sorted(build.RENDERERS),
+                        dest="formats", help="format to render (repeatable, default: all)")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--screen", metavar="CSV",
+                        help="take each report's funnel counts from a screening run on this indicator CSV")
+    parser.add_argument("--threshold", action="append", default=[], metavar="COLUMN=VALUE",
+                        help=f"{screening.THRESHOLD_HELP}; scenarios can also give \"thresholds\"")
+    args = parser.parse_args(argv)
+    screen = None
+    if args.threshold and not args.screen:
+        parser.error("--threshold needs --screen")
+    if args.screen:
+        try:
+            screen = screening.load_indicators(args.screen), screening.parse_thresholds(args.threshold)
+        except (KeyError, ValueError) as exc:
+            parser.exit(2, f"error: {exc.args[0] if exc.args else exc}\n")
+    try:
+        failures = run_batch(load_manifest(args.manifest), args.out_dir, args.formats, args.workers, screen)
+    except ValueError as exc:
+        parser.exit(2, f"error: {exc}\n")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
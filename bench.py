@@ -0,0 +1,194 @@
+from dataclasses import replace
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import build
+import doc_model as dm
+from case_study import build_document
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+REPORT_DIR = os.path.join(BASE, "reports", "bench")
+SCALES = (1, 10, 100, 1000)
+
+
+def longer_tables(blocks, rows):
+    # Repeats the body of every table rows times; header rows stay on top.
+    out = []
+    for b in blocks:
+        if isinstance(b, dm.Table):
+            head = max(b.header_rows) + 1
+            b = replace(b, rows=b.rows[:head] + b.rows[head:] * rows)
+        out.append(b)
+    return tuple(out)
+
+
+def synthetic(document, factor, table_rows=1):
+    # factor copies of every section and slide, so sections, bullets, table
+    # rows and slides all grow linearly with the factor. table_rows grows
+    # each table instead, which is what row cloning and repeated page
+    # headers scale with.
+    if table_rows > 1:
+        document = replace(
+            document,
+            sections=tuple(replace(s, blocks=longer_tables(s.blocks, table_rows)) for s in document.sections),
+            slides=tuple(replace(s, blocks=longer_tables(s.blocks, table_rows)) for s in document.slides))
+    if factor == 1:
+        return document
+    sections = tuple(replace(s, title=f"{s.title} ({i + 1})")
+                     for i in range(factor) for s in document.sections)
+    slides = tuple(replace(s, title=f"{s.title} ({i + 1})")
+                   for i in range(factor) for s in document.slides)
+    return replace(document, sections=sections, slides=slides)
+
+
+def content_stats(document):
+    blocks = [b for s in document.sections for b in s.blocks]
+    blocks += [b for s in document.slides for b in s.blocks]
+    return {
+        "sections": len(document.sections),
+        "slides": len(document.slides),
+        "bullets": sum(isinstance(b, dm.Bullet) for b in blocks),
+        "table_rows": sum(len(b.rows) for b in blocks if isinstance(b, dm.Table)),
+        "longest_table": max((len(b.rows) for b in blocks if isinstance(b, dm.Table)), default=0),
+    }
+
+
+def measure(fmt, document, out_dir):
+    render = build.renderer(fmt)
+    path = os.path.join(out_dir, f"bench.{fmt}")
+
+    # Timed and traced separately: tracemalloc slows allocation-heavy code
+    # by 2-3x and would distort the wall time.
+    gc.collect()
+    start = time.perf_counter()
+    render(document, path)
+    wall = time.perf_counter() - start
+
+    # tracemalloc only sees Python's allocator, not the lxml trees behind
+    # python-docx/python-pptx, hence py_heap_mb; rss_mb is the whole process.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        render(document, path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"wall_s": round(wall, 4), "py_heap_mb": round(peak / 2**20, 2), "bytes": os.path.getsize(path)}
+
+
+def peak_rss(fmt, factor, table_rows):
+    # Peak RSS of a fresh process that imports the backend and renders the
+    # case once, so earlier cases do not raise the high-water mark.
+    code = f"import bench; bench.rss_case({fmt!r}, {factor}, {table_rows})"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=BASE, capture_output=True, text=True)
+    if proc.returncode:
+        return None
+    return round(float(proc.stdout.split()[-1]) / 2**20, 1)
+
+
+def rss_case(fmt, factor, table_rows):
+    document = synthetic(build_document(), factor, table_rows)
+    with tempfile.TemporaryDirectory() as out_dir:
+        build.renderer(fmt)(document, os.path.join(out_dir, f"bench.{fmt}"))
+    # On Linux ru_maxrss carries over the parent's high-water mark through
+    # fork/exec, so read this process's own VmHWM instead.
+    try:
+        with open("/proc/self/status") as f:
+            print(int(next(line for line in f if line.startswith("VmHWM:")).split()[1]) * 1024)
+            return
+    except OSError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(rss if sys.platform == "darwin" else rss * 1024)      # bytes on macOS, KiB elsewhere
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    versions = {}
+    for module in ("reportlab", "docx", "pptx", "numpy"):
+        try:
+            versions[module] = getattr(__import__(module), "__version__", "") or \
+                getattr(sys.modules[module], "Version", "")
+        except ImportError:
+            versions[module] = None
+    return {"commit": commit, "python": platform.python_version(),
+            "machine": platform.machine(), "versions": versions}
+
+
+def run(scales=SCALES, formats=None, table_rows=1):
+    formats = list(formats or build.RENDERERS)
+    base = build_document()
+    results = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        # Warm-up so import and font-loading cost is not billed to 1x.
+        for fmt in formats:
+            build.renderer(fmt)(base, os.path.join(out_dir, f"warmup.{fmt}"))
+        for factor in scales:
+            document = synthetic(base, factor, table_rows)
+            stats = content_stats(document)
+            for fmt in formats:
+                row = {"format": fmt, "scale": factor, "row_factor": table_rows, **stats,
+                       **measure(fmt, document, out_dir), "rss_mb": peak_rss(fmt, factor, table_rows)}
+                results.append(row)
+                rss = f"{row['rss_mb']:9.1f}" if row["rss_mb"] is not None else f"{'-':>9}"
+                print(f"{fmt:<5} {factor:>5}x  {row['wall_s']*1000:10.1f} ms  "
+                      f"{row['py_heap_mb']:9.1f} MB heap  {rss} MB rss  {row['bytes']/1024:10.1f} KB", flush=True)
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(), "results": results}
+
+
+def compare(old, new):
+    before = {(r["format"], r["scale"], r.get("row_factor", 1)): r for r in old["results"]}
+    print(f"\n{'':<5} {'scale':>6}  {'wall':>8}  {'heap':>8}  {'rss':>8}  {'size':>8}   (new / old)")
+    for r in new["results"]:
+        o = before.get((r["format"], r["scale"], r.get("row_factor", 1)))
+        if not o:
+            continue
+        o = {"py_heap_mb": o.get("peak_mb"), **o}      # older files called it peak_mb
+        ratios = [r[k] / o[k] if r.get(k) and o.get(k) else float("nan")
+                  for k in ("wall_s", "py_heap_mb", "rss_mb", "bytes")]
+        print(f"{r['format']:<5} {r['scale']:>5}x  " + "  ".join(f"{x:7.2f}x" for x in ratios))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PDF, DOCX and PPTX builders on scaled content.")
+    parser.add_argument("formats", nargs="*", metavar="FORMAT",
+                        help=f"builders to measure: {', '.join(build.RENDERERS)} (default: all)")
+    parser.add_argument("--scales", default=",".join(map(str, SCALES)),
+                        help="comma-separated size factors (default: %(default)s)")
+    parser.add_argument("--table-rows", type=int, default=1, metavar="N",
+                        help="also repeat the body of every table N times (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="result file (default: reports/bench/<timestamp>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier result file to compare against")
+    args = parser.parse_args(argv)
+    unknown = set(args.formats) - set(build.RENDERERS)
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(sorted(unknown))}")
+    if args.table_rows < 1:
+        parser.error("--table-rows must be at least 1")
+
+    report = run([int(s) for s in args.scales.split(",")], args.formats, args.table_rows)
+    path = args.output or os.path.join(REPORT_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"wrote {path}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
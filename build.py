@@ -0,0 +1,255 @@
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import functools
+import importlib
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import spans
+from outputs import DOCX_PATH, OUTPUT_PATH, PPTX_PATH, SLIDES_PATH
+
+# Backends are looked up by module name and imported on first use, so a
+# DOCX-only build never loads reportlab or python-pptx, nor a PPTX-only one
+# python-docx.
+RENDERERS = {
+    "pdf": ("build_pdf", "render_pdf", OUTPUT_PATH),
+    "docx": ("build_docs", "render_docx", DOCX_PATH),
+    "pptx": ("build_pptx", "render_pptx", PPTX_PATH),
+    "slides": ("build_pdf", "render_slides_pdf", SLIDES_PATH),
+}
+# Renderers that take jobs= to lay out in several processes.
+PARALLEL = {"pdf", "slides"}
+# Renderers that take stream=True to build without holding the whole document.
+STREAMING = {"pdf", "slides", "docx"}
+# Of those, the ones whose streamed file differs from the default one, so the
+# flag is part of their cache key.
+STREAM_CHANGES_OUTPUT = {"docx"}
+
+# Subcommands that hand their arguments to another module's main().
+TOOLS = {
+    "batch": ("batch", "render one report per scenario in a manifest"),
+    "sensitivity": ("sensitivity", "Monte Carlo weight-sensitivity report"),
+    "screen": ("screening", "run the market-screening funnel on an indicator CSV"),
+    "bench": ("bench", "benchmark every builder on synthetic content at 1x-1000x"),
+    "serve": ("serve", "serve PDF/DOCX/PPTX renders over HTTP from a worker pool"),
+    "watch": ("watch", "rebuild affected outputs on every save from a warm process"),
+    "ingest": ("indicators", "score markets 1-5 from CSV/JSON indicator extracts"),
+    "optimize": ("optimize", "compare default and optimized output size and render time"),
+    "whatif": ("ranking", "edit scores and weights interactively and watch the ranking move"),
+    "pdfcheck": ("build_pdf", "check that a parallel PDF build matches the serial one page by page"),
+}
+
+
+def renderer(fmt):
+    module, func, _ = RENDERERS[fmt]
+    return getattr(importlib.import_module(module), func)
+
+
+def output_path(fmt):
+    return RENDERERS[fmt][2]
+
+
+def file_name(stem, fmt):
+    # "report.pdf" for formats named after their extension, "report-slides.pdf"
+    # for the others.
+    ext = os.path.splitext(output_path(fmt))[1]
+    return f"{stem}{ext}" if ext == f".{fmt}" else f"{stem}-{fmt}{ext}"
+
+
+def atomic_render(render, document, path):
+    # Render next to the target and rename over it, so readers never see a
+    # half-written file and a failed build leaves the previous output alone.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        render(document, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def render_format(fmt, document, path=None, jobs=None, optimize=False, stream=False):
+    path = path or output_path(fmt)
+    render = renderer(fmt)
+    if jobs and fmt in PARALLEL:
+        render = functools.partial(render, jobs=jobs)
+    if stream and fmt in STREAMING:
+        render = functools.partial(render, stream=True)
+    if optimize:
+        render = functools.partial(render, optimize=True)
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    with spans.span("render", fmt):
+        atomic_render(render, document, path)
+    return fmt, path, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def render_in_worker(fmt, document, jobs=None, optimize=False, stream=False):
+    # Pool workers exit without running atexit hooks, so their trace spans
+    # travel back with the result.
+    return render_format(fmt, document, jobs=jobs, optimize=optimize, stream=stream), spans.collect()
+
+
+def build_all(document=None, formats=None, parallel=True, force=False, jobs=None, optimize=False,
+              stream=False):
+    from build_cache import BuildCache, part_hashes
+    from case_study import build_document
+
+    document = document or build_document()
+    formats = list(formats or RENDERERS)
+    start = time.perf_counter()
+
+    cache = BuildCache()
+    parts = part_hashes(document)
+    todo, plans = [], {}
+    for fmt in formats:
+        path = output_path(fmt)
+        options = (("optimize",) if optimize else ()) + (("stream",) if stream and fmt in STREAM_CHANGES_OUTPUT else ())
+        key, relevant, fresh, changed = cache.plan(fmt, path, parts, options)
+        if fresh and not force:
+            print(f"{fmt:<6} up to date  {path}")
+            continue
+        if changed and not force:
+            print(f"{fmt:<6} changed: {', '.join(changed)}")
+        todo.append(fmt)
+        plans[fmt] = (key, relevant)
+
+    if parallel and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=len(todo)) as pool:
+            futures = [pool.submit(render_in_worker, fmt, document, jobs, optimize, stream) for fmt in todo]
+            results = []
+            for future in futures:
+                result, events = future.result()
+                results.append(result)
+                spans.merge(events)
+    else:
+        results = [render_format(fmt, document, jobs=jobs, optimize=optimize, stream=stream) for fmt in todo]
+    total = time.perf_counter() - start
+
+    for fmt, path, wall, cpu in results:
+        cache.record(path, *plans[fmt])
+        print(f"{fmt:<6} wall {wall*1000:8.1f} ms  cpu {cpu*1000:8.1f} ms  {path}")
+    if results:
+        cache.save()
+    print(f"total wall {total*1000:.1f} ms")
+    return results
+
+
+def profile_imports(argv, top=20):
+    # Re-run the same command under -X importtime and summarize the
+    # cumulative cost of each top-level import.
+    proc = subprocess.run([sys.executable, "-X", "importtime", os.path.abspath(__file__), *argv],
+                          stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative, name = line.split(":", 1)[1].split("|")
+        if not self_us.strip().isdigit():
+            continue                        # column header
+        name = name[1:]
+        if not name.startswith(" "):        # nested imports are indented
+            rows.append((int(cumulative), int(self_us), name))
+    rows.sort(reverse=True)
+    print(f"\n{'cumulative ms':>13} {'self ms':>8}  top-level import")
+    for cumulative, self_us, name in rows[:top]:
+        print(f"{cumulative/1000:13.1f} {self_us/1000:8.1f}  {name}")
+    print(f"{sum(r[0] for r in rows)/1000:13.1f} {'':>8}  total")
+    return proc.returncode
+
+
+def bench_startup(runs=5):
+    # A fresh interpreter per run: the cost of importing the CLI alone and
+    # with each backend loaded.
+    targets = {"cli": "import build"}
+    for fmt in RENDERERS:
+        targets[fmt] = f"import build; build.renderer({fmt!r})"
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"{'target':<6} {'min ms':>8} {'median ms':>10}   ({runs} runs)")
+    for name, code in targets.items():
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=here, check=True)
+            times.append(time.perf_counter() - start)
+        print(f"{name:<6} {min(times)*1000:8.1f} {statistics.median(times)*1000:10.1f}")
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if "--profile-imports" in argv:
+        argv.remove("--profile-imports")
+        sys.exit(profile_imports(argv))
+    if argv and argv[0] in TOOLS:
+        return importlib.import_module(TOOLS[argv[0]][0]).main(argv[1:])
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["all"] + argv
+
+    import screening
+
+    parser = argparse.ArgumentParser(description="Render the case study to PDF, DOCX and PPTX.")
+    parser.add_argument("--profile-imports", action="store_true",
+                        help="run the command under -X importtime and report the slowest imports")
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    formats = [("all", "build every format")] + [(f, f"build {os.path.basename(output_path(f))} only")
+                                                  for f in RENDERERS]
+    for name, help_text in formats:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--force", action="store_true", help="ignore the build cache and rebuild")
+        p.add_argument("--sensitivity", type=int, metavar="DRAWS",
+                       help="add a weight-sensitivity table from DRAWS Monte Carlo weight sets")
+        p.add_argument("--serial", action="store_true", help="render in this process, one after another")
+        p.add_argument("-j", "--jobs", type=int, metavar="N",
+                       help="lay out PDFs in N processes and merge the pages (needs pypdf)")
+        p.add_argument("--optimize", action="store_true",
+                       help="smaller files: compressed PDF streams, slimmed OOXML parts and images")
+        p.add_argument("--stream", action="store_true",
+                       help="build long documents in flat memory (PDF: flowables made as pages fill; "
+                            "DOCX: document.xml written straight into the zip)")
+        p.add_argument("--indicators", metavar="MANIFEST",
+                       help="score the markets from the indicator extracts listed in MANIFEST")
+        p.add_argument("--screen", metavar="CSV",
+                       help="take the screening-funnel counts from a run on this indicator CSV")
+        p.add_argument("--threshold", action="append", default=[], metavar="COLUMN=VALUE",
+                       help=screening.THRESHOLD_HELP)
+
+    p = sub.add_parser("startup", help="benchmark interpreter + import time per backend")
+    p.add_argument("--runs", type=int, default=5)
+
+    # Listed for --help only; main() dispatches these before parsing.
+    for name, (_, help_text) in TOOLS.items():
+        sub.add_parser(name, help=help_text)
+
+    args = parser.parse_args(argv)
+    if args.command == "startup":
+        return bench_startup(args.runs)
+
+    document = None
+    if args.sensitivity or args.indicators or args.screen or args.threshold:
+        import scoring
+        from case_study import build_document
+        funnel = screening.funnel_from_args(parser, args)
+        countries, matrix = scoring.COUNTRIES, scoring.SCORES
+        if args.indicators:
+            import indicators
+            try:
+                countries, matrix = indicators.scoring_inputs(indicators.load_manifest(args.indicators))
+            except (KeyError, ValueError) as exc:
+                sys.exit(f"error: {exc}")
+        table = None
+        if args.sensitivity:
+            import sensitivity
+            table = sensitivity.run(countries, matrix, draws=args.sensitivity)
+        document = build_document(countries=countries, matrix=matrix, funnel=funnel, sensitivity=table)
+    formats = None if args.command == "all" else [args.command]
+    build_all(document, formats=formats, parallel=not args.serial, force=args.force, jobs=args.jobs,
+              optimize=args.optimize, stream=args.stream)
+
+
+if __name__ == "__main__":
+    main()
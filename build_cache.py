@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+
+import fonts
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE, ".build_cache")
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+
+# Which parts of the document each output actually reads, and which source
+# files hold its layout code and style constants. The font files found on
+# this machine are hashed in too (PDF embeds them, charts draw with them).
+CONSUMES = {
+    "pdf": ("title", "sections", "slides"),
+    "docx": ("title", "sections"),
+    "pptx": ("slides",),
+    "slides": ("slides",),
+}
+RENDERER_SOURCES = {
+    "pdf": ("build_pdf.py", "charts.py", "doc_model.py", "fonts.py", "optimize.py"),
+    "docx": ("build_docs.py", "docx_stream.py", "charts.py", "doc_model.py", "fonts.py", "optimize.py"),
+    "pptx": ("build_pptx.py", "charts.py", "doc_model.py", "fonts.py", "optimize.py"),
+    "slides": ("build_pdf.py", "charts.py", "doc_model.py", "fonts.py", "optimize.py"),
+}
+
+
+def digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def part_hashes(document):
+    # The model is made of frozen dataclasses over str/float/tuple, so repr()
+    # is a stable serialization of everything a section or slide renders.
+    parts = {"title": digest(document.title, document.subtitle)}
+    for i, section in enumerate(document.sections):
+        parts[f"sections/{i}"] = digest(repr(section))
+    for i, slide in enumerate(document.slides):
+        parts[f"slides/{i}"] = digest(repr(slide))
+    return parts
+
+
+def style_hash(fmt):
+    h = hashlib.sha256()
+    for name in RENDERER_SOURCES[fmt]:
+        with open(os.path.join(BASE, name), "rb") as f:
+            h.update(f.read())
+    h.update(repr(fonts.font_files()).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def render_key(fmt, parts, style=None, options=()):
+    # Identifies an output: the parts of the document this format reads plus
+    # the renderer code, styles and options that turn them into bytes.
+    relevant = {k: v for k, v in parts.items() if k.split("/")[0] in CONSUMES[fmt]}
+    key = digest(fmt, style or style_hash(fmt), json.dumps(relevant, sort_keys=True), *options)
+    return key, relevant
+
+
+class BuildCache:
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def plan(self, fmt, output_path, parts, options=()):
+        key, relevant = render_key(fmt, parts, options=options)
+        entry = self.entries.get(os.path.abspath(output_path))
+        fresh = bool(entry) and entry["key"] == key and os.path.exists(output_path)
+        old = entry["parts"] if entry else {}
+        changed = sorted(k for k in relevant.keys() | old.keys() if relevant.get(k) != old.get(k))
+        return key, relevant, fresh, changed
+
+    def record(self, output_path, key, parts):
+        self.entries[os.path.abspath(output_path)] = {"key": key, "parts": parts}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -1,17 +1,27 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
-from reportlab.lib.colors import HexColor, white, black
+from reportlab.lib.colors import HexColor, black
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-    PageBreak
+    BaseDocTemplate, PageTemplate, Frame, NextPageTemplate,
+    Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
 )
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
 from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-import os
+from collections import deque
+from contextlib import nullcontext
+from itertools import islice
+from xml.sax.saxutils import escape
+import io
+import sys
+
+import charts
+import doc_model as dm
+import fonts
+import spans
+from outputs import OUTPUT_PATH, SLIDES_PATH
+from case_study import build_document
 
-OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "True_Fruits_Case_Study_FINAL.pdf")
 
 BLACK = black
 GRAY = HexColor("#666666")
@@ -19,9 +29,7 @@ LIGHT_GRAY = HexColor("#cccccc")
 BLUE = HexColor("#4472C4")
 LIGHT_BLUE = HexColor("#D6E4F0")
 
-FONT = "Times-Roman"
-FONT_B = "Times-Bold"
-FONT_I = "Times-Italic"
+FONT, FONT_B, FONT_I = fonts.pdf_fonts()
 
 title_style = ParagraphStyle("Title", fontSize=16, fontName=FONT_B,
     alignment=TA_CENTER, spaceAfter=4, textColor=BLACK)
@@ -36,14 +44,22 @@ body = ParagraphStyle("Body", fontSize=11, fontName=FONT, leading=16,
 bullet_style = ParagraphStyle("Bullet", fontSize=11, fontName=FONT,
     leading=15, spaceAfter=4, leftIndent=20, bulletIndent=8, textColor=BLACK)
 
-slide_title = ParagraphStyle("SlTitle", fontSize=16, fontName=FONT_B,
-    spaceAfter=8, textColor=BLUE, alignment=TA_LEFT)
-slide_body = ParagraphStyle("SlBody", fontSize=10, fontName=FONT,
-    leading=14, spaceAfter=4, textColor=BLACK)
-slide_bullet = ParagraphStyle("SlBullet", fontSize=10, fontName=FONT,
-    leading=13, spaceAfter=3, leftIndent=16, bulletIndent=6, textColor=BLACK)
-slide_h2 = ParagraphStyle("SlH2", fontSize=11, fontName=FONT_B,
-    spaceBefore=6, spaceAfter=3, textColor=BLACK)
+slide_title = ParagraphStyle("SlTitle", fontSize=24, leading=28, fontName=FONT_B,
+    spaceAfter=10, textColor=BLUE, alignment=TA_LEFT)
+slide_subtitle = ParagraphStyle("SlSub", fontSize=13, leading=17, fontName=FONT_I,
+    spaceAfter=8, textColor=GRAY)
+slide_body = ParagraphStyle("SlBody", fontSize=13, fontName=FONT,
+    leading=18, spaceAfter=5, textColor=BLACK)
+slide_bullet = ParagraphStyle("SlBullet", fontSize=13, fontName=FONT,
+    leading=17, spaceAfter=4, leftIndent=20, bulletIndent=8, textColor=BLACK)
+slide_h2 = ParagraphStyle("SlH2", fontSize=14, fontName=FONT_B,
+    spaceBefore=8, spaceAfter=4, textColor=BLACK)
+slide_cover = ParagraphStyle("SlCover", parent=slide_title, fontSize=32, leading=38,
+    alignment=TA_CENTER, spaceAfter=14)
+slide_cover_sub = ParagraphStyle("SlCoverSub", fontSize=16, leading=20, fontName=FONT_I,
+    alignment=TA_CENTER, textColor=GRAY, spaceAfter=24)
+slide_cover_note = ParagraphStyle("SlCoverNote", fontSize=13, leading=17, fontName=FONT,
+    alignment=TA_CENTER, textColor=GRAY)
 
 def p(text, s=body):
     return Paragraph(text, s)
@@ -54,368 +70,575 @@ def b(text):
 def sb(text):
     return Paragraph(f"<bullet>&bull;</bullet> {text}", slide_bullet)
 
-def simple_table(data, widths=None, header_bg=LIGHT_BLUE):
-    t = Table(data, colWidths=widths, hAlign="LEFT")
-    cmds = [
-        ("FONTNAME", (0, 0), (-1, -1), FONT), ("FONTSIZE", (0, 0), (-1, -1), 9),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("TOPPADDING", (0, 0), (-1, -1), 4), ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-        ("LEFTPADDING", (0, 0), (-1, -1), 5),
-        ("GRID", (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
-        ("BACKGROUND", (0, 0), (-1, 0), header_bg),
-        ("FONTNAME", (0, 0), (-1, 0), FONT_B),
-    ]
-    t.setStyle(TableStyle(cmds))
-    return t
+def markup(runs):
+    out = []
+    for r in runs:
+        text = escape(r.text)
+        if r.underline:
+            text = f"<u>{text}</u>"
+        if r.italic:
+            text = f"<i>{text}</i>"
+        if r.bold:
+            text = f"<b>{text}</b>"
+        out.append(text)
+    return "".join(out)
 
 
-def build_writeup(story):
-    story.append(p("True Fruits: International Expansion", title_style))
-    story.append(p("Case Study Analysis", subtitle_style))
-
-    # Q1
-    story.append(p("<u>Q1: How Attractive Is the Smoothie Industry & How Is True Fruits Positioned?</u>", h1))
-
-    story.append(p("<b>Porter's Five Forces</b>", h2))
-    story.append(p(
-        "I would say the smoothie industry is moderately attractive. The market is worth about "
-        "$17.8 billion globally and growing around 10% a year, so there is definitely money to be made. "
-        "But when you actually look at each of Porter's forces, it gets more complicated."
-    ))
-    story.append(b("<b>New Entrants (Moderate):</b> Making smoothies is not that hard, but getting into stores and setting up refrigerated shipping is expensive. That keeps a lot of smaller players out."))
-    story.append(b("<b>Supplier Power (Moderate-High):</b> Fresh fruit prices go up and down a lot depending on weather and seasons. True Fruits can not just swap in cheap fillers because they promise no additives."))
-    story.append(b("<b>Buyer Power (High):</b> Big grocery stores basically decide what goes on shelves. Consumers can also just grab a different brand without thinking twice."))
-    story.append(b("<b>Substitutes (High):</b> There are tons of alternatives. Juice, kombucha, protein shakes, energy drinks, or just eating fruit."))
-    story.append(b("<b>Rivalry (High):</b> Innocent has Coca-Cola behind them. PepsiCo has Naked. Danone and Nestle are in the space too."))
-
-    story.append(Spacer(1, 6))
-    story.append(p("<b>SWOT</b>", h2))
-    swot = [
-        ["Strengths", "Weaknesses"],
-        ["- 70%+ market share in Germany\n- Premium glass bottles, all natural\n- Strong brand identity\n- Eckes-Granini owns 67%\n- 70M euros in revenue (2023)",
-         "- Only 35 employees\n- Outsources all manufacturing\n- Controversial marketing history\n- Not much international experience\n- Glass is expensive to ship"],
-        ["Opportunities", "Threats"],
-        ["- EU smoothie market growing 4.4%/yr\n- Health trend keeps getting bigger\n- Lots of countries they haven't entered\n- E-commerce as a new channel",
-         "- Innocent backed by Coca-Cola\n- Fruit prices are unpredictable\n- Their edgy ads could backfire abroad\n- Inflation hurting premium products"],
-    ]
-    t = Table(swot, colWidths=[3.1*inch, 3.1*inch])
-    t.setStyle(TableStyle([
+LONG_TABLE_ROWS = 60      # tables longer than this are laid out a page at a time
+LONG_TABLE_CHUNK = 80     # rows handed to reportlab per page; must exceed rows per page
+
+
+def table_style(header_bg=LIGHT_BLUE, header_rows=(0,), padding=4):
+    cmds = [
         ("FONTNAME", (0, 0), (-1, -1), FONT), ("FONTSIZE", (0, 0), (-1, -1), 9),
         ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("TOPPADDING", (0, 0), (-1, -1), padding), ("BOTTOMPADDING", (0, 0), (-1, -1), padding),
+        ("LEFTPADDING", (0, 0), (-1, -1), padding + 1),
         ("GRID", (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
-        ("FONTNAME", (0, 0), (-1, 0), FONT_B), ("FONTNAME", (0, 2), (-1, 2), FONT_B),
-        ("BACKGROUND", (0, 0), (-1, 0), LIGHT_BLUE),
-        ("BACKGROUND", (0, 2), (-1, 2), LIGHT_BLUE),
-        ("TOPPADDING", (0, 0), (-1, -1), 5), ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-    ]))
-    story.append(t)
-    story.append(Spacer(1, 8))
-
-    # Q2
-    story.append(p("<u>Q2: How Did Bilzerian Get From 192 to 32 Countries?</u>", h1))
-    story.append(p(
-        "He basically used a funnel. Started with every country in the world and kept cutting based "
-        "on whether it actually made sense for True Fruits to go there."
-    ))
-    story.append(b("<b>Round 1 (192 to around 80):</b> Cut countries where people can not afford a $2.50 glass bottle smoothie. Set a minimum GDP per capita. Also removed really small countries and unstable ones."))
-    story.append(b("<b>Round 2 (80 to around 50):</b> Cut countries without cold-chain logistics, since smoothies go bad without refrigeration. Also removed places without real supermarkets or with really high tariffs."))
-    story.append(b("<b>Round 3 (50 to 32):</b> Narrowed it down based on how close they are to Germany, whether people there are into health food, and if Eckes-Granini already has connections in that market."))
-    story.append(Spacer(1, 4))
-    story.append(p(
-        "I think GDP per capita and cold-chain infrastructure were probably the two biggest deal breakers. "
-        "You just can not sell an expensive smoothie where people can not pay for it, and you can not ship "
-        "it somewhere it will spoil. Some other variables I think would have been useful: how much fruit "
-        "people in that country already consume, how big social media is there (since True Fruits relies "
-        "on viral marketing), and whether the country has glass recycling infrastructure since their "
-        "bottles are a big part of the brand."
-    ))
-
-    # Q3
-    story.append(p("<u>Q3: Top Three Countries</u>", h1))
-    story.append(p(
-        "I made a scoring model with 10 criteria to try to rank the countries objectively. Each country "
-        "gets a 1 to 5 on each factor, multiplied by the weight, then I added them up. I left out "
-        "Germany, Austria, Switzerland, Luxembourg, France, and Spain since True Fruits is already there."
-    ))
-    story.append(Spacer(1, 4))
-
-    hdr = ["Country", "GDP\n15%", "Pop\n10%", "Mkt\n15%", "Prox\n10%", "Cold\n10%",
-           "Retail\n10%", "Health\n10%", "Comp\n5%", "Ease\n10%", "Cult\n5%", "Score"]
-    rows = [hdr,
-        ["Netherlands","5","3","4","5","5","5","5","3","5","5","4.50"],
-        ["UK","4","5","5","3","5","5","5","2","4","4","4.30"],
-        ["Denmark","5","2","3","4","5","5","5","4","5","5","4.20"],
-        ["Sweden","4","3","3","3","5","5","5","4","5","4","4.05"],
-        ["Belgium","4","2","3","5","5","5","4","3","5","4","3.95"],
-        ["Norway","5","2","3","3","5","5","5","4","4","4","3.95"],
-        ["Italy","3","5","4","4","4","4","4","3","3","3","3.70"],
-        ["Canada","4","4","3","1","5","5","5","3","5","3","3.70"],
-        ["Poland","2","4","3","4","3","4","3","4","4","3","3.30"],
-        ["Japan","3","5","3","1","5","5","4","3","3","2","3.30"],
-    ]
-    cw = [0.95*inch] + [0.47*inch]*10 + [0.52*inch]
-    story.append(simple_table(rows, widths=cw))
-    story.append(Spacer(1, 6))
-    story.append(p(
-        "<b>Formula:</b> Score = (GDP x .15) + (Pop x .10) + (Mkt x .15) + (Prox x .10) + "
-        "(Cold x .10) + (Retail x .10) + (Health x .10) + (Comp x .05) + (Ease x .10) + (Culture x .05)"
-    ))
-    story.append(Spacer(1, 4))
-    story.append(p(
-        "<b>1. Netherlands (4.50)</b> - Right next to Germany so shipping is cheap. GDP per capita "
-        "is $73K. Has great grocery chains like Albert Heijn. Eckes-Granini already has distribution "
-        "there which is a huge advantage. EU member so no tariffs."
-    ))
-    story.append(p(
-        "<b>2. United Kingdom (4.30)</b> - Biggest smoothie market in Europe at 18.6% of the "
-        "continent. 67 million people. Innocent is the main competitor but True Fruits has a "
-        "totally different vibe. Downside is Brexit makes trade more complicated."
-    ))
-    story.append(p(
-        "<b>3. Denmark (4.20)</b> - GDP per capita of $76K which is one of the highest in Europe. "
-        "Danes really care about organic and natural food which fits True Fruits well. Also a good "
-        "stepping stone into the rest of Scandinavia. EU member so zero trade barriers."
-    ))
-
-    # Q4
-    story.append(p("<u>Q4: Is Exporting the Best Mode of Entry?</u>", h1))
-    story.append(p(
-        "Exporting makes sense for right now since True Fruits is so small. But it is not the only "
-        "option. Here are the main modes of entry and how they fit:"
-    ))
-
-    moe = [
-        ["Mode", "What It Is", "Pros", "Cons", "True Fruits Fit"],
-        ["Exporting", "Make in Germany,\nship abroad", "Low cost and risk,\neasy to pull out", "Glass is heavy/costly\nto ship, spoilage risk", "Good for now"],
-        ["Licensing", "Local company\nmakes your product", "Almost zero\ninvestment needed", "Lose quality control\nwhich is their whole brand", "Bad fit"],
-        ["Franchising", "Partner runs your\nbusiness system", "Fast growth,\nlocal knowledge", "This is for restaurants\nnot bottled products", "Does not\napply"],
-        ["Joint Venture", "Partner with a\nlocal company", "Shared risk and\nlocal expertise", "Share profits,\npossible conflicts", "Could work for\nfarther markets"],
-        ["FDI", "Build or buy\noperations abroad", "Total control\nover everything", "Way too expensive\nfor 35 people", "Too early"],
-    ]
-    story.append(simple_table(moe, widths=[0.8*inch, 1.05*inch, 1.1*inch, 1.2*inch, 1.15*inch, 0.9*inch]))
-    story.append(Spacer(1, 6))
-    story.append(p(
-        "The criteria you use to pick a country definitely change depending on your mode of entry. "
-        "If you are exporting, proximity and cold-chain logistics matter a ton. But if you do a joint "
-        "venture and produce locally, those barely matter anymore. Instead you need to care about "
-        "finding the right partner and protecting your brand. My recommendation would be to start "
-        "exporting to the Netherlands and Denmark since they are close, then think about a joint "
-        "venture for the UK once there is proof the product sells."
-    ))
-
-    # Q5
-    story.append(p("<u>Q5: Challenges They Will Face</u>", h1))
-    story.append(p("<b>Internal:</b>"))
-    story.append(b("35 employees is barely enough to run Germany, let alone three new countries"))
-    story.append(b("Their contract manufacturer needs to be able to handle way more volume"))
-    story.append(b("Their edgy marketing works in Germany but could offend people in other countries"))
-    story.append(b("Shipping glass bottles internationally is expensive and they break"))
-    story.append(b("All the upfront costs (listing fees, marketing, logistics) come before any revenue"))
-    story.append(Spacer(1, 4))
-    story.append(p("<b>External:</b>"))
-    story.append(b("Getting shelf space at foreign grocery stores is super competitive"))
-    story.append(b("Innocent has Coca-Cola money and will fight to keep their market share"))
-    story.append(b("Brexit means extra customs paperwork and possible tariffs for the UK"))
-    story.append(b("People in different countries like different flavors and portion sizes"))
-    story.append(b("Currency changes between euros, pounds, and kroner can cut into profits"))
-
-    story.append(Spacer(1, 16))
-
-    # Sources
-    story.append(p("<u>Sources</u>", h1))
-    srcs = [
-        "True Fruits. Wikipedia. en.wikipedia.org/wiki/True_Fruits",
-        "True Fruits Case, Rotterdam School of Management (813-044-1).",
-        'Duhig, A. "True Fruits Potential Viability in the Paraguay Market." Medium.',
-        'Fortune Business Insights. "Smoothie Market Size and Analysis, 2026-2034."',
-        'Market Data Forecast. "Europe Smoothies Market Report, 2034."',
-        'IMARC Group. "Europe Smoothies Market, 2025-2033."',
-        'Worldometer. "GDP per Capita, 2025."',
-        'Eurostat. "Population and Population Change Statistics, 2025."',
-        'Mainsights.io. "Eckes-Granini Acquires Majority Stake in True Fruits."',
-        'World Bank. "B-READY 2025 Business Environment Assessment."',
-        'MBA Knowledge Base. "Modes of Entry into International Business."',
     ]
-    for i, s in enumerate(srcs, 1):
-        story.append(p(f"{i}. {s}"))
-
-    story.append(PageBreak())
-
+    for r in header_rows:
+        cmds.append(("BACKGROUND", (0, r), (-1, r), header_bg))
+        cmds.append(("FONTNAME", (0, r), (-1, r), FONT_B))
+    return TableStyle(cmds)
+
+
+class PagedTable(Flowable):
+    # A long table that only ever hands reportlab one page worth of rows.
+    # Splitting a plain Table re-measures every remaining row on each page,
+    # which is quadratic; here each split builds a Table of at most
+    # LONG_TABLE_CHUNK rows and keeps an offset into the shared row list.
+
+    def __init__(self, header, rows, widths, style, start=0, chunk=LONG_TABLE_CHUNK):
+        Flowable.__init__(self)
+        self.header, self.rows, self.widths, self.style = header, rows, widths, style
+        self.start, self.chunk = start, chunk
+        self.hAlign = "LEFT"
+        self._table = None
+
+    def _more(self):
+        return self.start + self.chunk < len(self.rows)
+
+    def _build(self):
+        body = self.rows[self.start:self.start + self.chunk]
+        t = Table([self.header] + body, colWidths=self.widths, hAlign="LEFT", repeatRows=1)
+        t.setStyle(self.style)
+        return t
+
+    def wrap(self, availWidth, availHeight):
+        self._table = self._build()
+        w, h = self._table.wrap(availWidth, availHeight)
+        # Rows beyond this chunk still follow, so never claim to fit: the
+        # frame then asks us to split and the rest moves on.
+        return w, (max(h, availHeight + 1) if self._more() else h)
+
+    def split(self, availWidth, availHeight):
+        t = self._table or self._build()
+        t.wrap(availWidth, availHeight)
+        parts = t.split(availWidth, availHeight)
+        if not parts:
+            return []
+        first = parts[0]
+        taken = len(parts[0]._cellvalues) - 1 if len(parts) > 1 else len(t._cellvalues) - 1
+        if taken <= 0:
+            return []
+        rest = self.start + taken
+        if rest >= len(self.rows):
+            return [first]
+        return [first, PagedTable(self.header, self.rows, self.widths, self.style, rest, self.chunk)]
+
+    def draw(self):
+        self._table.drawOn(self.canv, 0, 0)
+
+
+class LayoutMark(Flowable):
+    # Zero-size marker, only added when tracing. doc.build draws it when
+    # layout reaches this point, which closes the previous layout span and
+    # opens the next, so page layout time shows up per section and slide.
+
+    def __init__(self, label, state):
+        Flowable.__init__(self)
+        self.label, self.state = label, state
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        close_layout(self.state)
+        self.state.update(label=self.label, start=spans.now())
+
+
+def close_layout(state):
+    if state.get("label"):
+        spans.record(f"layout: {state['label']}", state["start"], spans.now())
+    state["label"] = None
+
+
+def draw_ops(canv, ops):
+    for op in ops:
+        if op[0] == "rect":
+            _, x, y, w, h, fill = op
+            if w > 0 and h > 0:
+                canv.setFillColor(HexColor(fill))
+                canv.rect(x, y, w, h, stroke=0, fill=1)
+        elif op[0] == "line":
+            _, x1, y1, x2, y2, color, width = op
+            canv.setStrokeColor(HexColor(color))
+            canv.setLineWidth(width)
+            canv.line(x1, y1, x2, y2)
+        else:
+            _, x, y, text, size, color, anchor, bold = op
+            canv.setFont(FONT_B if bold else FONT, size)
+            canv.setFillColor(HexColor(color))
+            draw = {"start": canv.drawString, "middle": canv.drawCentredString, "end": canv.drawRightString}[anchor]
+            draw(x, y, text)
+
+
+class ChartFlowable(Flowable):
+    # Vector chart. The static part (axes, gridlines, labels, legend) is a
+    # form XObject keyed by its own hash, so charts that share axes, such as
+    # one per country, store it once; each distinct chart is a second form
+    # wrapping that plus its bars, and repeats of it are a single doForm.
+
+    def __init__(self, chart):
+        Flowable.__init__(self)
+        self.chart = chart
+        self.width, self.height = charts.size(chart)
+        self.hAlign = "LEFT"
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        canv = self.canv
+        name = f"chart-{charts.chart_key(self.chart)}"
+        if not canv.hasForm(name):
+            w, h, static, marks = charts.layout(self.chart)
+            base = f"chart-base-{charts.static_key(self.chart)}"
+            if not canv.hasForm(base):
+                canv.beginForm(base, 0, 0, w, h)
+                draw_ops(canv, static)
+                canv.endForm()
+            canv.beginForm(name, 0, 0, w, h)
+            canv.doForm(base)
+            draw_ops(canv, marks)
+            canv.endForm()
+        canv.doForm(name)
+
+
+@spans.traced()
+def simple_table(data, widths=None, header_bg=LIGHT_BLUE, header_rows=(0,), padding=4, paged=True):
+    style = table_style(header_bg, header_rows, padding)
+    if paged and len(data) > LONG_TABLE_ROWS and tuple(header_rows) == (0,):
+        return PagedTable(list(data[0]), [list(r) for r in data[1:]], widths, style)
+    t = Table(data, colWidths=widths, hAlign="LEFT", repeatRows=len(header_rows) == 1)
+    t.setStyle(style)
+    return t
 
-def make_slide(story, title, content_fn):
-    inner = []
-    inner.append(Paragraph(title, slide_title))
-    inner.append(Spacer(1, 4))
-    content_fn(inner)
 
-    slide = Table([[inner]], colWidths=[6.3*inch], rowHeights=[3.5*inch])
-    slide.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), white),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 14),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 14),
-        ("TOPPADDING", (0, 0), (-1, -1), 14),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
-        ("BOX", (0, 0), (-1, -1), 1, LIGHT_GRAY),
-        ("LINEBELOW", (0, 0), (-1, 0), 0, white),
-    ]))
-    story.append(slide)
-    story.append(Spacer(1, 12))
-
-
-def build_slides(story):
-
-    def s1(inner):
-        inner.append(Spacer(1, 50))
-        inner.append(Paragraph("Where Should They Expand Next?", ParagraphStyle(
-            "x", fontSize=13, fontName=FONT_I, alignment=TA_CENTER, textColor=GRAY, spaceAfter=20)))
-        inner.append(Paragraph("Case Study Analysis", ParagraphStyle(
-            "x2", fontSize=11, fontName=FONT, alignment=TA_CENTER, textColor=GRAY)))
-    make_slide(story, "True Fruits: International Expansion", s1)
-
-    def s2(inner):
-        inner.append(Paragraph("Global smoothie market: $17.8B, growing about 10%/year", slide_body))
-        inner.append(Spacer(1, 4))
-        d = [["Force", "Rating", "Why"],
-             ["New Entrants", "Moderate", "Cold-chain and shelf space are barriers"],
-             ["Supplier Power", "Mod-High", "Fruit prices jump around"],
-             ["Buyer Power", "High", "Retailers control shelf space"],
-             ["Substitutes", "High", "Juice, kombucha, protein shakes, etc."],
-             ["Rivalry", "High", "Innocent/Coca-Cola, PepsiCo, Danone"]]
-        t = Table(d, colWidths=[1.1*inch, 0.85*inch, 3.0*inch])
-        t.setStyle(TableStyle([
-            ("FONTNAME", (0, 0), (-1, -1), FONT), ("FONTSIZE", (0, 0), (-1, -1), 9),
-            ("BACKGROUND", (0, 0), (-1, 0), LIGHT_BLUE),
-            ("FONTNAME", (0, 0), (-1, 0), FONT_B),
-            ("GRID", (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
-            ("TOPPADDING", (0, 0), (-1, -1), 3), ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-            ("LEFTPADDING", (0, 0), (-1, -1), 4),
-        ]))
-        inner.append(t)
-        inner.append(Spacer(1, 4))
-        inner.append(Paragraph("Overall: moderately attractive industry", slide_body))
-    make_slide(story, "Porter's Five Forces", s2)
-
-    def s3(inner):
-        d = [["Strengths", "Weaknesses"],
-             ["- 70%+ German market share\n- All-natural, glass bottles\n- Bold brand\n- Eckes-Granini backing",
-              "- 35 employees\n- Outsourced production\n- Controversial marketing\n- Limited intl experience"],
-             ["Opportunities", "Threats"],
-             ["- EU market growing 4.4%/yr\n- Health trend keeps building\n- Untapped markets nearby",
-              "- Innocent has Coca-Cola\n- Fruit price swings\n- Ads could backfire abroad"]]
-        t = Table(d, colWidths=[2.8*inch, 2.8*inch])
-        t.setStyle(TableStyle([
-            ("FONTNAME", (0, 0), (-1, -1), FONT), ("FONTSIZE", (0, 0), (-1, -1), 9),
-            ("FONTNAME", (0, 0), (-1, 0), FONT_B), ("FONTNAME", (0, 2), (-1, 2), FONT_B),
-            ("BACKGROUND", (0, 0), (-1, 0), LIGHT_BLUE),
-            ("BACKGROUND", (0, 2), (-1, 2), LIGHT_BLUE),
-            ("GRID", (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
-            ("TOPPADDING", (0, 0), (-1, -1), 4), ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-            ("LEFTPADDING", (0, 0), (-1, -1), 5), ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ]))
-        inner.append(t)
-    make_slide(story, "SWOT Analysis", s3)
-
-    def s4(inner):
-        inner.append(sb("<b>Round 1 (192 to ~80):</b> GDP per capita, population, political stability"))
-        inner.append(sb("<b>Round 2 (~80 to ~50):</b> Cold-chain logistics, modern retail, tariffs"))
-        inner.append(sb("<b>Round 3 (~50 to 32):</b> Proximity, health trends, Eckes-Granini network"))
-        inner.append(Spacer(1, 8))
-        inner.append(Paragraph("<b>Most important filters:</b>", slide_body))
-        inner.append(sb("GDP per capita - premium product needs people who can pay"))
-        inner.append(sb("Cold-chain infrastructure - smoothies spoil without refrigeration"))
-        inner.append(sb("Proximity to Germany - keeps shipping costs and spoilage down"))
-    make_slide(story, "Market Screening: 192 to 32", s4)
-
-    def s5(inner):
-        inner.append(Paragraph("Weighted scoring model with 10 criteria, each scored 1-5", slide_body))
-        inner.append(Spacer(1, 4))
-        d = [["Rank", "Country", "Score", "Why"],
-             ["1", "Netherlands", "4.50", "Next to Germany, high GDP, Eckes-Granini network"],
-             ["2", "UK", "4.30", "Biggest smoothie market in Europe"],
-             ["3", "Denmark", "4.20", "Rich consumers, health-obsessed, EU member"],
-             ["4", "Sweden", "4.05", "Health-conscious, great infrastructure"],
-             ["5", "Belgium", "3.95", "Right next door, EU single market"]]
-        t = Table(d, colWidths=[0.5*inch, 1.1*inch, 0.6*inch, 3.0*inch])
-        t.setStyle(TableStyle([
-            ("FONTNAME", (0, 0), (-1, -1), FONT), ("FONTSIZE", (0, 0), (-1, -1), 9),
-            ("BACKGROUND", (0, 0), (-1, 0), LIGHT_BLUE),
-            ("FONTNAME", (0, 0), (-1, 0), FONT_B),
-            ("GRID", (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
-            ("TOPPADDING", (0, 0), (-1, -1), 3), ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-            ("LEFTPADDING", (0, 0), (-1, -1), 4),
-        ]))
-        inner.append(t)
-    make_slide(story, "Top Country Rankings", s5)
-
-    def s6(inner):
-        inner.append(Paragraph("<b>Netherlands</b>", slide_body))
-        inner.append(sb("GDP/cap: $73K | 17.8M people | Borders Germany"))
-        inner.append(sb("Eckes-Granini already distributes there | No tariffs"))
-        inner.append(Spacer(1, 3))
-        inner.append(Paragraph("<b>United Kingdom</b>", slide_body))
-        inner.append(sb("Biggest smoothie market in Europe | 67M people"))
-        inner.append(sb("Innocent is the main competitor | Brexit adds trade friction"))
-        inner.append(Spacer(1, 3))
-        inner.append(Paragraph("<b>Denmark</b>", slide_body))
-        inner.append(sb("GDP/cap: $76K | Strong organic food culture"))
-        inner.append(sb("Gateway to rest of Scandinavia | EU member"))
-    make_slide(story, "Why These Three Countries?", s6)
-
-    def s7(inner):
-        d = [["Mode", "Risk", "Cost", "Control", "Fit for True Fruits"],
-             ["Exporting", "Low", "Low", "Low", "Good for now"],
-             ["Licensing", "Low", "Low", "Low", "Bad - quality risk"],
-             ["Franchising", "Med", "Low", "Med", "Does not apply"],
-             ["Joint Venture", "Med", "Med", "Shared", "Good for far markets"],
-             ["FDI", "High", "High", "Full", "Too early"]]
-        t = Table(d, colWidths=[1.0*inch, 0.55*inch, 0.55*inch, 0.65*inch, 1.5*inch])
-        t.setStyle(TableStyle([
-            ("FONTNAME", (0, 0), (-1, -1), FONT), ("FONTSIZE", (0, 0), (-1, -1), 9),
-            ("BACKGROUND", (0, 0), (-1, 0), LIGHT_BLUE),
-            ("FONTNAME", (0, 0), (-1, 0), FONT_B),
-            ("GRID", (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
-            ("TOPPADDING", (0, 0), (-1, -1), 3), ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-            ("LEFTPADDING", (0, 0), (-1, -1), 4),
-        ]))
-        inner.append(t)
-        inner.append(Spacer(1, 6))
-        inner.append(sb("Start with exporting to Netherlands and Denmark"))
-        inner.append(sb("Consider a joint venture for the UK once demand is proven"))
-    make_slide(story, "Modes of Entry", s7)
-
-    def s8(inner):
-        inner.append(Paragraph("<b>Internal</b>", slide_body))
-        inner.append(sb("Need to hire - 35 people is not enough"))
-        inner.append(sb("Manufacturer has to scale up production"))
-        inner.append(sb("Marketing needs to be toned down for new cultures"))
-        inner.append(sb("Glass bottles are heavy and fragile to ship"))
-        inner.append(Spacer(1, 4))
-        inner.append(Paragraph("<b>External</b>", slide_body))
-        inner.append(sb("Getting shelf space is really competitive"))
-        inner.append(sb("Innocent/Coca-Cola will push back hard"))
-        inner.append(sb("Brexit complicates UK trade"))
-        inner.append(sb("Different countries have different taste preferences"))
-        inner.append(Spacer(1, 4))
-        inner.append(Paragraph("<b>Plan:</b> Go Netherlands first, then UK, then Denmark", slide_body))
-    make_slide(story, "Challenges and Recommendations", s8)
-
-
-def build():
-    doc = SimpleDocTemplate(
-        OUTPUT_PATH, pagesize=letter,
-        leftMargin=1*inch, rightMargin=1*inch,
-        topMargin=1*inch, bottomMargin=1*inch,
-    )
-    story = []
-    build_writeup(story)
-
-    story.append(p("Slides", title_style))
-    story.append(Spacer(1, 8))
-    build_slides(story)
-
-    doc.build(story)
+def flowable(block, slide=False):
+    if isinstance(block, dm.Heading):
+        return p(escape(block.text), slide_h2 if slide else h2)
+    if isinstance(block, dm.Bullet):
+        return (sb if slide else b)(markup(block.runs))
+    if isinstance(block, dm.Paragraph):
+        return p(markup(block.runs), slide_body if slide else body)
+    if isinstance(block, dm.Table):
+        widths = [w*inch for w in block.widths] if block.widths else None
+        return simple_table([list(r) for r in block.rows], widths=widths,
+                            header_rows=block.header_rows, padding=3 if slide else 4)
+    if isinstance(block, dm.Spacer):
+        return Spacer(1, block.height)
+    if isinstance(block, dm.Chart):
+        return ChartFlowable(block)
+    raise TypeError(f"Unsupported block: {type(block).__name__}")
+
+
+def block_flowables(blocks, label, slide=False):
+    # One flowable per block, made as the consumer asks for it. When
+    # tracing, the span adds up conversion time only, not the layout that
+    # runs between yields in a streaming build.
+    if not spans.ENABLED:
+        for block in blocks:
+            yield flowable(block, slide)
+        return
+    start = spans.now()
+    total = 0
+    for block in blocks:
+        t = spans.now()
+        f = flowable(block, slide)
+        total += spans.now() - t
+        yield f
+    spans.record(f"pdf section: {label}", start, start + total)
+
+
+def writeup_story(document, marks=None, outline=None, live=True):
+    yield p(escape(document.title), title_style)
+    yield p(escape(document.subtitle), subtitle_style)
+
+    for i, section in enumerate(document.sections):
+        if marks is not None:
+            yield LayoutMark(section.title, marks)
+        if outline is not None:
+            yield Bookmark(section.title, f"section-{i}", 0, outline, live)
+        yield p(f"<u>{escape(section.title)}</u>", h1)
+        yield from block_flowables(section.blocks, section.title)
+
+
+def slide_flowables(slide):
+    if slide.kind == "title":
+        out = [Spacer(1, 1.6*inch), Paragraph(escape(slide.title), slide_cover)]
+        if slide.subtitle:
+            out.append(Paragraph(escape(slide.subtitle), slide_cover_sub))
+        out += [Paragraph(markup(block.runs), slide_cover_note) for block in slide.blocks]
+        return out
+    out = [Paragraph(escape(slide.title), slide_title)]
+    if slide.subtitle:
+        out.append(Paragraph(escape(slide.subtitle), slide_subtitle))
+    out += [flowable(block, slide=True) for block in slide.blocks]
+    return out
+
+
+def slides_story(slides, marks=None, outline=None, first=0, level=1, live=True):
+    # One slide per page on the landscape slide template; a slide whose
+    # content does not fit continues on the next slide page.
+    for i, slide in enumerate(slides, first):
+        if i > first:
+            yield PageBreak()
+        if marks is not None:
+            yield LayoutMark(f"slide {slide.title}", marks)
+        if outline is not None:
+            yield Bookmark(slide.title, f"slide-{i}", level, outline, live)
+        with spans.span("pdf slide", slide.title):
+            flowables = slide_flowables(slide)
+        yield from flowables
+
+
+class LazyStory:
+    # The list interface BaseDocTemplate.build() uses (len, [i], del [0],
+    # insert(0), [0:0] = parts), fed from a generator. Only the flowables
+    # reportlab is currently placing are held; each is dropped once drawn,
+    # so memory stays flat however long the story is.
+
+    def __init__(self, flowables):
+        self._source = iter(flowables)
+        self._buffer = deque()
+        self._done = False
+
+    def _fill(self, n):
+        while len(self._buffer) < n and not self._done:
+            try:
+                self._buffer.append(next(self._source))
+            except StopIteration:
+                self._done = True
+
+    def __len__(self):
+        # Buffer at least one flowable, plus every one a keepWithNext chain
+        # at the end pulls in, so handle_keepWithNext sees the whole chain.
+        self._fill(1)
+        while not self._done and self._buffer[-1].getKeepWithNext():
+            self._fill(len(self._buffer) + 1)
+        return len(self._buffer)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            self._fill(i.stop if i.stop is not None else float("inf"))
+            return list(islice(self._buffer, *i.indices(len(self._buffer))))
+        self._fill(i + 1)
+        return self._buffer[i]
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            for _ in range(*i.indices(len(self._buffer))):
+                self._buffer.popleft()
+        elif i == 0:
+            self._buffer.popleft()
+        else:
+            del self._buffer[i]
+
+    def __setitem__(self, i, items):
+        if not (isinstance(i, slice) and i.start in (0, None) and i.stop == 0):
+            raise TypeError("LazyStory only supports story[0:0] = flowables")
+        self._buffer.extendleft(reversed(list(items)))
+
+    def insert(self, i, item):
+        self._buffer.insert(i, item)
+
+
+class Bookmark(Flowable):
+    # Zero-size outline anchor. Records (title, level, page) in entries and,
+    # when live, adds the outline entry to the PDF being drawn; chunks of a
+    # parallel build only record, and the merge rebuilds the outline.
+
+    def __init__(self, title, key, level, entries, live=True):
+        Flowable.__init__(self)
+        self.title, self.key, self.level = title, key, level
+        self.entries, self.live = entries, live
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.entries.append((self.title, self.level, self.canv.getPageNumber()))
+        if self.live:
+            self.canv.bookmarkPage(self.key)
+            self.canv.addOutlineEntry(self.title, self.key, self.level)
+
+
+PAGE_NUMBER_FONT = "Times-Roman"       # base-14, so chunk merges can reuse it
+PAGE_NUMBER_SIZE = 9
+PAGE_NUMBER_Y = 0.4*inch
+SLIDE_SIZE = (10*inch, 7.5*inch)        # same 4:3 page as the PPTX deck
+
+
+def page_number_position(number, width=letter[0]):
+    label = str(number)
+    return label, (width - pdfmetrics.stringWidth(label, PAGE_NUMBER_FONT, PAGE_NUMBER_SIZE)) / 2, PAGE_NUMBER_Y
+
+
+def page_decorator(slide, numbered, width):
+    # onPage hook: slide pages get their frame border drawn straight on the
+    # canvas; page numbers are left off in parallel chunks and stamped by
+    # the merge instead. width is the template's own page width: doc.pagesize
+    # is only the first template's.
+    def decorate(canv, doc):
+        canv.saveState()
+        if slide:
+            # Drawn once as a form XObject and referenced from every slide.
+            if not canv.hasForm("slideFrame"):
+                canv.beginForm("slideFrame")
+                canv.setStrokeColor(LIGHT_GRAY)
+                canv.setLineWidth(1)
+                canv.rect(0.3*inch, 0.3*inch, SLIDE_SIZE[0] - 0.6*inch, SLIDE_SIZE[1] - 0.6*inch)
+                canv.setStrokeColor(BLUE)
+                canv.setLineWidth(3)
+                canv.line(0.3*inch, SLIDE_SIZE[1] - 0.3*inch, SLIDE_SIZE[0] - 0.3*inch, SLIDE_SIZE[1] - 0.3*inch)
+                canv.endForm()
+            canv.doForm("slideFrame")
+        if numbered:
+            label, x, y = page_number_position(canv.getPageNumber(), width)
+            canv.setFont(PAGE_NUMBER_FONT, PAGE_NUMBER_SIZE)
+            canv.setFillColor(GRAY)
+            canv.drawString(x, y, label)
+        canv.restoreState()
+    return decorate
+
+
+def pdf_template(path, slides_first=False, numbered=True):
+    writeup = PageTemplate("writeup", [Frame(1*inch, 1*inch, letter[0] - 2*inch, letter[1] - 2*inch, id="body")],
+                           onPage=page_decorator(False, numbered, letter[0]), pagesize=letter)
+    slide = PageTemplate("slide", [Frame(0.6*inch, 0.6*inch, SLIDE_SIZE[0] - 1.2*inch, SLIDE_SIZE[1] - 1.2*inch,
+                                         id="slide")],
+                         onPage=page_decorator(True, numbered, SLIDE_SIZE[0]), pagesize=SLIDE_SIZE)
+    templates = [slide, writeup] if slides_first else [writeup, slide]
+    return BaseDocTemplate(path, pagesize=templates[0].pagesize, pageTemplates=templates)
+
+
+def pdf_story(document, slides_only=False, marks=None, outline=None):
+    if slides_only:
+        yield from slides_story(document.slides, marks, outline, level=0)
+        return
+    yield from writeup_story(document, marks, outline)
+    if document.slides:
+        yield NextPageTemplate("slide")
+        yield PageBreak()
+        if outline is not None:
+            yield Bookmark("Slides", "slides", 0, outline)
+        yield from slides_story(document.slides, marks, outline)
+
+
+def render_pdf(document, path=OUTPUT_PATH, jobs=1, slides_only=False, optimize=False, stream=False):
+    # stream=True feeds doc.build() from a generator instead of a prebuilt
+    # list, for documents too long to hold as flowables; pages are identical.
+    if jobs > 1 and len(document.slides) > 1:
+        return render_pdf_parallel(document, path, jobs, slides_only, optimize, stream)
+    from optimize import optimize_pdf, pdf_options, write_bytes
+
+    target = io.BytesIO() if optimize else path
+    doc = pdf_template(target, slides_first=slides_only)
+    outline = []
+    marks = {} if spans.ENABLED else None
+    story = pdf_story(document, slides_only, marks, outline)
+    story = LazyStory(story) if stream else list(story)
+
+    with spans.span("doc.build", pages=None) as sp, pdf_options(optimize):
+        doc.build(story)
+        if marks is not None:
+            close_layout(marks)
+            sp.args["pages"] = doc.page
+    if optimize:
+        with spans.span("pdf optimize"):
+            write_bytes(path, optimize_pdf(target.getvalue()))
+
+
+def render_slides_pdf(document, path=SLIDES_PATH, jobs=1, optimize=False, stream=False):
+    render_pdf(document, path, jobs, slides_only=True, optimize=optimize, stream=stream)
+
+
+def chunk_ranges(count, jobs):
+    # About two chunks per worker for load balancing.
+    size = -(-count // (2 * jobs))
+    return [(i, min(i + size, count)) for i in range(0, count, size)]
+
+
+def chunk_story(document, part, entries, slides_only=False):
+    if part is None:
+        yield from writeup_story(document, outline=entries, live=False)
+        return
+    start, stop = part
+    if start == 0 and not slides_only:
+        yield Bookmark("Slides", "slides", 0, entries, live=False)
+    yield from slides_story(document.slides[start:stop], outline=entries, first=start,
+                            level=0 if slides_only else 1, live=False)
+
+
+def render_chunk(document, part, path, slides_only=False, optimize=False, stream=False):
+    # One independently laid-out piece: the write-up (part None) or a run of
+    # slides. Page numbers and the outline are added by the merge.
+    from optimize import pdf_options
+
+    entries = []
+    story = chunk_story(document, part, entries, slides_only)
+    story = LazyStory(story) if stream else list(story)
+    doc = pdf_template(path, slides_first=part is not None, numbered=False)
+    with pdf_options(optimize):
+        doc.build(story)
+    return doc.page, entries
+
+
+def render_pdf_parallel(document, path=OUTPUT_PATH, jobs=None, slides_only=False, optimize=False, stream=False):
+    # Lays out the write-up and runs of slides in separate processes and
+    # concatenates the pages. Every chunk boundary is already a page break
+    # (slides start on their own template, one slide per page), so the
+    # merged pages match a serial build.
+    from concurrent.futures import ProcessPoolExecutor
+    import os
+    import tempfile
+
+    jobs = jobs or os.cpu_count() or 1
+    parts = ([] if slides_only else [None]) + chunk_ranges(len(document.slides), jobs)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"chunk-{i}.pdf") for i in range(len(parts))]
+        with spans.span("pdf chunks", parts=len(parts)):
+            with ProcessPoolExecutor(max_workers=min(jobs, len(parts))) as pool:
+                results = list(pool.map(render_chunk, [document] * len(parts), parts, paths,
+                                        [slides_only] * len(parts), [optimize] * len(parts),
+                                        [stream] * len(parts)))
+        with spans.span("pdf merge"):
+            merge_chunks(paths, results, path, optimize)
+
+
+def merge_chunks(paths, results, path, optimize=False):
+    try:
+        from pypdf import PdfWriter
+        from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+    except ImportError:
+        raise ImportError("parallel PDF rendering needs pypdf (pip install pypdf)") from None
+
+    writer = PdfWriter()
+    offset, parent = 0, None
+    for chunk, (pages, entries) in zip(paths, results):
+        writer.append(chunk, import_outline=False)
+        for title, level, page in entries:
+            item = writer.add_outline_item(title, offset + page - 1, parent=parent if level else None)
+            if level == 0:
+                parent = item
+        offset += pages
+
+    # Same numbers page_decorator puts on a serial build: a base-14 font
+    # resource and a short text stream appended to each page's contents.
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"), NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject(f"/{PAGE_NUMBER_FONT}"),
+    }))
+    rgb = " ".join(f"{c:.3f}" for c in GRAY.rgb())
+    for number, page in enumerate(writer.pages, 1):
+        label, x, y = page_number_position(number, float(page.mediabox.width))
+        resources = page.setdefault(NameObject("/Resources"), DictionaryObject())
+        fonts_dict = resources.setdefault(NameObject("/Font"), DictionaryObject())
+        fonts_dict.get_object()[NameObject("/PgNo")] = font
+        before, after = DecodedStreamObject(), DecodedStreamObject()
+        before.set_data(b"q\n")
+        after.set_data(f"Q q {rgb} rg BT /PgNo {PAGE_NUMBER_SIZE} Tf {x:.2f} {y:.2f} Td ({label}) Tj ET Q\n".encode())
+        contents = page["/Contents"].get_object()
+        streams = list(contents) if isinstance(contents, ArrayObject) else [page.raw_get("/Contents")]
+        page[NameObject("/Contents")] = ArrayObject(
+            [writer._add_object(before), *streams, writer._add_object(after)])
+
+    writer.page_mode = "/UseOutlines"
+    if optimize:
+        from optimize import shrink_pdf_writer
+        shrink_pdf_writer(writer)
+    with open(path, "wb") if isinstance(path, str) else nullcontext(path) as f:
+        writer.write(f)
+
+
+def page_texts(page):
+    # (x, y, text) of every text run on the page in page space, the layout
+    # two builds of the same content must agree on whatever their content
+    # streams look like.
+    out = []
+
+    def visit(text, cm, tm, font, size):
+        if text.strip():
+            x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+            y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+            out.append((round(x, 1), round(y, 1), text.strip()))
+
+    page.extract_text(visitor_text=visit)
+    return sorted(out)
+
+
+def compare_pdfs(a, b):
+    # Page-by-page differences between two PDFs: page size and placed text.
+    from pypdf import PdfReader
+
+    pages_a, pages_b = PdfReader(a).pages, PdfReader(b).pages
+    problems = []
+    if len(pages_a) != len(pages_b):
+        problems.append(f"page count {len(pages_a)} != {len(pages_b)}")
+    for number, (p, q) in enumerate(zip(pages_a, pages_b), 1):
+        size_a, size_b = tuple(map(float, p.mediabox)), tuple(map(float, q.mediabox))
+        if size_a != size_b:
+            problems.append(f"page {number}: size {size_a} != {size_b}")
+        text_a, text_b = page_texts(p), page_texts(q)
+        if text_a != text_b:
+            only_a, only_b = set(text_a) - set(text_b), set(text_b) - set(text_a)
+            problems.append(f"page {number}: {sorted(only_a)[:3]} vs {sorted(only_b)[:3]}")
+    return problems
+
+
+def check_parallel(document, jobs=2, slides_only=False):
+    serial, parallel = io.BytesIO(), io.BytesIO()
+    render_pdf(document, serial, slides_only=slides_only)
+    render_pdf(document, parallel, jobs=jobs, slides_only=slides_only)
+    return compare_pdfs(serial, parallel)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check that a parallel PDF build matches the serial one page by page.")
+    parser.add_argument("-j", "--jobs", type=int, default=2, help="processes for the parallel build (default: 2)")
+    parser.add_argument("--slides", action="store_true", help="check the slides-only PDF")
+    parser.add_argument("--markets", type=int, metavar="N",
+                        help="rank N markets (case markets plus random scores), e.g. 192 for the full screen")
+    args = parser.parse_args(argv)
+    if args.markets:
+        import scoring
+        countries, matrix = scoring.synthetic_markets(args.markets)
+        document = build_document(countries=countries, matrix=matrix)
+    else:
+        document = build_document()
+    problems = check_parallel(document, args.jobs, args.slides)
+    for line in problems:
+        print(line)
+    if problems:
+        sys.exit(f"{len(problems)} page(s) differ")
+    print("serial and parallel PDFs match")
+
+
+def build(document=None):
+    render_pdf(document or build_document())
     print(f"Done: {OUTPUT_PATH}")
 
 if __name__ == "__main__":
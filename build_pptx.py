@@ -0,0 +1,193 @@
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.oxml.shapes.graphfrm import CT_GraphicalObjectFrame
+from pptx.parts.slide import SlidePart
+from copy import deepcopy
+import io
+
+import charts
+import doc_model as dm
+import fonts
+import spans
+from optimize import save_package
+from outputs import PPTX_PATH
+from case_study import build_document
+
+
+EMU_PER_INCH = 914400
+A_OFF, A_EXT = qn("a:off"), qn("a:ext")
+
+
+def text_style(size, bold=False, color=None, space_after=None):
+    # <a:lstStyle> for a prototype text body: the shape carries the style and
+    # the runs cloned into it carry none.
+    fill = f'<a:solidFill><a:srgbClr val="{color}"/></a:solidFill>' if color else ""
+    spacing = f'<a:spcAft><a:spcPts val="{space_after * 100}"/></a:spcAft>' if space_after else ""
+    weight = ' b="1"' if bold else ""
+    return (f'<a:lstStyle><a:lvl1pPr>{spacing}<a:defRPr sz="{size * 100}"{weight}>'
+            f'{fill}<a:latin typeface="{fonts.SANS}"/></a:defRPr></a:lvl1pPr></a:lstStyle>')
+
+
+def textbox_prototype(style, left, top, width, height):
+    return parse_xml(
+        f'<p:sp {nsdecls("a", "p")}><p:nvSpPr><p:cNvPr id="0" name="TextBox"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+        f'<p:spPr><a:xfrm><a:off x="{left}" y="{top}"/><a:ext cx="{width}" cy="{height}"/></a:xfrm>'
+        f'<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+        f'<p:txBody><a:bodyPr wrap="square"><a:spAutoFit/></a:bodyPr>{style}</p:txBody></p:sp>')
+
+
+def paragraph_prototype(ppr="", rpr=""):
+    run = f"<a:r>{rpr}<a:t/></a:r>" if rpr is not None else ""
+    return parse_xml(f'<a:p {nsdecls("a")}>{ppr}{run}</a:p>')
+
+
+def fill_paragraph(template, text):
+    # Clone a prototype paragraph and set its text; line breaks become
+    # <a:br/> with a copy of the run in between, as python-pptx does.
+    p = deepcopy(template)
+    run = p.r_lst[0]
+    lines = text.split("\n")
+    run[-1].text = lines[0]
+    for line in lines[1:]:
+        br = p.makeelement(qn("a:br"), {})
+        if run.rPr is not None:
+            br.append(deepcopy(run.rPr))
+        nxt = deepcopy(run)
+        nxt[-1].text = line
+        p.append(br)
+        p.append(nxt)
+    return p
+
+
+def render_pptx(document, path=PPTX_PATH, optimize=False):
+    inch = EMU_PER_INCH
+    prs = Presentation()
+    prs.slide_width = 10 * inch
+    prs.slide_height = int(7.5 * inch)
+    blank = prs.slide_layouts[6].part
+    package = prs.part.package
+    sld_ids = prs.slides._sldIdLst
+
+    left = int(0.6 * inch)
+    width = int(8.8 * inch)
+
+    # Every slide is assembled from these prototypes: styles are set once
+    # here and each slide only clones shapes and fills in text.
+    title_box = textbox_prototype(text_style(28, bold=True, color="333333"), left, int(0.4 * inch), width, int(0.8 * inch))
+    subtitle_box = textbox_prototype(text_style(14, color="888888"), left, int(1.15 * inch), width, int(0.4 * inch))
+    body_box = textbox_prototype(text_style(14, space_after=4), left, 0, width, 0)
+    plain_p = paragraph_prototype()
+    bold_p = paragraph_prototype('<a:pPr><a:spcAft><a:spcPts val="800"/></a:spcAft></a:pPr>',
+                                 '<a:rPr lang="en-US" sz="1600" b="1"/>')
+    spacer_p = paragraph_prototype('<a:pPr><a:spcAft><a:spcPts val="600"/></a:spcAft></a:pPr>', None)
+    cell_ps = [paragraph_prototype(rpr=f'<a:rPr lang="en-US" sz="1100"{b}><a:latin typeface="{fonts.SANS}"/></a:rPr>')
+               for b in (' b="1"', "")]
+    row_height = int(0.35 * inch)
+    table_frames = {}
+
+    def new_slide(number):
+        # SlidePart.new + a direct relationship and sldId: Slides.add_slide()
+        # rescans every existing relationship and slide id on each call,
+        # which is quadratic in the slide count.
+        part = SlidePart.new(PackURI(f"/ppt/slides/slide{number}.xml"), package, blank)
+        rId = prs.part._rels._add_relationship(RT.SLIDE, part)
+        sld_ids._add_sldId(id=255 + number, rId=rId)
+        return part, part.slide.shapes._spTree
+
+    def place(tree, prototype, top=None, height=None):
+        shape = deepcopy(prototype)
+        shape[0][0].set("id", str(len(tree)))
+        if top is not None:
+            shape.find(f".//{A_OFF}").set("y", str(top))
+            shape.find(f".//{A_EXT}").set("cy", str(height))
+        tree.append(shape)
+        return shape
+
+    def add_textbox(tree, blocks, top):
+        height = int(0.4 * inch * len(blocks))
+        body = place(tree, body_box, top, height)[-1]
+        for block in blocks:
+            if isinstance(block, dm.Spacer):
+                body.append(deepcopy(spacer_p))
+            elif isinstance(block, dm.Paragraph) and block.bold:
+                body.append(fill_paragraph(bold_p, block.text))
+            else:
+                body.append(fill_paragraph(plain_p, block.text))
+        return top + height
+
+    def add_table(tree, rows, top, header_rows=(0,)):
+        cols = len(rows[0])
+        if cols not in table_frames:
+            frame = CT_GraphicalObjectFrame.new_table_graphicFrame(
+                0, "Table", 1, cols, left, 0, int(8.5 * inch), row_height)
+            tbl = frame.graphic.graphicData.tbl
+            template_row = tbl.tr_lst[0]
+            tbl.remove(template_row)
+            for tc in template_row.tc_lst:
+                tc.txBody.remove(tc.txBody.p_lst[0])
+            table_frames[cols] = (frame, template_row)
+        frame, template_row = table_frames[cols]
+        shape = place(tree, frame, top, row_height * len(rows))
+        shape[0][0].set("name", f"Table {len(tree) - 1}")
+        tbl = shape.graphic.graphicData.tbl
+        for r, values in enumerate(rows):
+            tr = deepcopy(template_row)
+            for tc, value in zip(tr.tc_lst, values):
+                for line in str(value).split("\n"):
+                    tc.txBody.append(fill_paragraph(cell_ps[r not in header_rows], line))
+            tbl.append(tr)
+        return top + row_height * len(rows) + int(0.2 * inch)
+
+    def add_chart(part, tree, chart, top):
+        # Image parts are shared across slides by SHA-1, so a chart repeated
+        # on many slides is stored once.
+        _, rId = part.get_or_add_image_part(io.BytesIO(charts.png(chart)))
+        width, height = charts.size(chart)
+        width, height = int(width / 72 * inch), int(height / 72 * inch)
+        tree.add_pic(len(tree), f"Chart {len(tree)}", chart.title or "", rId, left, top, width, height)
+        return top + height + int(0.15 * inch)
+
+    def add_slide(number, s):
+        part, tree = new_slide(number)
+        place(tree, title_box)[-1].append(fill_paragraph(plain_p, s.title))
+
+        content_top = int(1.4 * inch)
+        if s.subtitle:
+            place(tree, subtitle_box)[-1].append(fill_paragraph(plain_p, s.subtitle))
+            content_top = int(1.7 * inch)
+
+        # consecutive text blocks share one textbox, tables and charts get
+        # their own shape
+        pending = []
+        for block in s.blocks:
+            if isinstance(block, (dm.Table, dm.Chart)):
+                if pending:
+                    content_top = add_textbox(tree, pending, content_top)
+                    pending = []
+                if isinstance(block, dm.Table):
+                    content_top = add_table(tree, block.rows, content_top, block.header_rows)
+                else:
+                    content_top = add_chart(part, tree, block, content_top)
+            else:
+                pending.append(block)
+        if pending:
+            add_textbox(tree, pending, content_top)
+
+    for number, s in enumerate(document.slides, 1):
+        with spans.span("add_slide", s.title):
+            add_slide(number, s)
+
+    with spans.span("prs.save"):
+        save_package(prs, path, optimize)
+
+
+def build_pptx(document=None):
+    render_pptx(document or build_document())
+    print(f"PowerPoint saved: {PPTX_PATH}")
+
+
+if __name__ == "__main__":
+    build_pptx()
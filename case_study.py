@@ -0,0 +1,441 @@
+import scoring
+import screening
+import spans
+from doc_model import (
+    Document, Section, Slide, para, bullet, heading, table, spacer, chart
+)
+
+COMPANY = "True Fruits"
+TITLE = f"{COMPANY}: International Expansion"
+SUBTITLE = "Case Study Analysis"
+
+
+@spans.traced()
+def q1(company=COMPANY):
+    swot = [
+        ["Strengths", "Weaknesses"],
+        ["- 70%+ market share in Germany\n- Premium glass bottles, all natural\n- Strong brand identity\n- Eckes-Granini owns 67%\n- 70M euros in revenue (2023)",
+         "- Only 35 employees\n- Outsources all manufacturing\n- Controversial marketing history\n- Not much international experience\n- Glass is expensive to ship"],
+        ["Opportunities", "Threats"],
+        ["- EU smoothie market growing 4.4%/yr\n- Health trend keeps getting bigger\n- Lots of countries they haven't entered\n- E-commerce as a new channel",
+         "- Innocent backed by Coca-Cola\n- Fruit prices are unpredictable\n- Their edgy ads could backfire abroad\n- Inflation hurting premium products"],
+    ]
+    return Section(f"Q1: How Attractive Is the Smoothie Industry & How Is {company} Positioned?", (
+        heading("Porter's Five Forces"),
+        para(
+            "I would say the smoothie industry is moderately attractive. The market is worth about "
+            "$17.8 billion globally and growing around 10% a year, so there is definitely money to be made. "
+            "But when you actually look at each of Porter's forces, it gets more complicated."
+        ),
+        bullet("<b>New Entrants (Moderate):</b> Making smoothies is not that hard, but getting into stores and setting up refrigerated shipping is expensive. That keeps a lot of smaller players out."),
+        bullet(f"<b>Supplier Power (Moderate-High):</b> Fresh fruit prices go up and down a lot depending on weather and seasons. {company} can not just swap in cheap fillers because they promise no additives."),
+        bullet("<b>Buyer Power (High):</b> Big grocery stores basically decide what goes on shelves. Consumers can also just grab a different brand without thinking twice."),
+        bullet("<b>Substitutes (High):</b> There are tons of alternatives. Juice, kombucha, protein shakes, energy drinks, or just eating fruit."),
+        bullet("<b>Rivalry (High):</b> Innocent has Coca-Cola behind them. PepsiCo has Naked. Danone and Nestle are in the space too."),
+        spacer(6),
+        heading("SWOT"),
+        table(swot, widths=[3.1, 3.1], header_rows=(0, 2)),
+        spacer(8),
+    ))
+
+
+# What Q2 says about each of the case's rounds; custom rounds get their
+# criteria instead.
+ROUND_NOTES = {
+    screening.ROUNDS[0].criteria: "Cut countries where people can not afford a $2.50 glass bottle smoothie. Set a minimum GDP per capita. Also removed really small countries and unstable ones.",
+    screening.ROUNDS[1].criteria: "Cut countries without cold-chain logistics, since smoothies go bad without refrigeration. Also removed places without real supermarkets or with really high tariffs.",
+    screening.ROUNDS[2].criteria: "Narrowed it down based on how close they are to Germany, whether people there are into health food, and if Eckes-Granini already has connections in that market.",
+}
+
+
+def funnel_steps(counts, approx, about, hedge_from=True):
+    # The case only gives round numbers for the intermediate rounds, so those
+    # are hedged ("around 80"); counts from an actual screening run are not.
+    def n(i, hedge=True):
+        hedge = hedge and approx and 0 < i < len(counts) - 1
+        return f"{about}{counts[i]}" if hedge else str(counts[i])
+    return [(n(i, hedge_from), n(i + 1)) for i in range(len(counts) - 1)]
+
+
+def funnel_table(funnel):
+    rows = [["Round", "In", "Out", "Main reasons for cutting"]]
+    for stage in funnel.stages:
+        top = sorted(stage.rejected.items(), key=lambda kv: -kv[1])[:2]
+        rows.append([stage.name, stage.entered, stage.survived,
+                     "; ".join(f"{r} ({n})" for r, n in top) or "-"])
+    return table(rows, widths=[0.8, 0.5, 0.5, 4.4])
+
+
+def funnel_chart(counts, width=6.0):
+    labels = ["All countries"] + [f"After round {i}" for i in range(1, len(counts))]
+    return chart("funnel", labels, counts, title="Countries left after each round", width=width)
+
+
+@spans.traced()
+def q2(funnel=None, company=COMPANY):
+    counts = funnel.counts() if funnel else screening.CASE_COUNTS
+    rounds = funnel.stages if funnel else screening.ROUNDS
+    steps = funnel_steps(counts, funnel is None, "around ", hedge_from=False)
+    blocks = (
+        para(
+            "He basically used a funnel. Started with every country in the world and kept cutting based "
+            f"on whether it actually made sense for {company} to go there."
+        ),
+    ) + tuple(
+        bullet(f"<b>{rnd.name} ({a} to {b}):</b> {ROUND_NOTES.get(rnd.criteria, f'Screened on {rnd.criteria}.')}")
+        for rnd, (a, b) in zip(rounds, steps)
+    ) + (
+        spacer(4),
+        funnel_chart(counts),
+        spacer(6),
+    )
+    if funnel:
+        blocks += (funnel_table(funnel), spacer(6))
+    return Section(f"Q2: How Did Bilzerian Get From {counts[0]} to {counts[-1]} Countries?", blocks + (
+        para(
+            "I think GDP per capita and cold-chain infrastructure were probably the two biggest deal breakers. "
+            "You just can not sell an expensive smoothie where people can not pay for it, and you can not ship "
+            "it somewhere it will spoil. Some other variables I think would have been useful: how much fruit "
+            f"people in that country already consume, how big social media is there (since {company} relies "
+            "on viral marketing), and whether the country has glass recycling infrastructure since their "
+            "bottles are a big part of the brand."
+        ),
+    ))
+
+
+# Narrative for the markets that can land in the top three; the scores in
+# front of them come from the ranking. {company} is filled in per report.
+COUNTRY_BLURBS = {
+    "Netherlands": ("Netherlands",
+        "Right next to Germany so shipping is cheap. GDP per capita "
+        "is $73K. Has great grocery chains like Albert Heijn. Eckes-Granini already has distribution "
+        "there which is a huge advantage. EU member so no tariffs."),
+    "UK": ("United Kingdom",
+        "Biggest smoothie market in Europe at 18.6% of the "
+        "continent. 67 million people. Innocent is the main competitor but {company} has a "
+        "totally different vibe. Downside is Brexit makes trade more complicated."),
+    "Denmark": ("Denmark",
+        "GDP per capita of $76K which is one of the highest in Europe. "
+        "Danes really care about organic and natural food which fits {company} well. Also a good "
+        "stepping stone into the rest of Scandinavia. EU member so zero trade barriers."),
+}
+SLIDE_REASONS = {
+    "Netherlands": "Next to Germany, high GDP, Eckes-Granini network",
+    "UK": "Biggest smoothie market in Europe",
+    "Denmark": "Rich consumers, health-obsessed, EU member",
+    "Sweden": "Health-conscious, great infrastructure",
+    "Belgium": "Right next door, EU single market",
+}
+SLIDE_FACTS = {
+    "Netherlands": ("GDP/cap: $73K | 17.8M people | Borders Germany",
+                    "Eckes-Granini already distributes there | No tariffs"),
+    "UK": ("Biggest smoothie market in Europe | 67M people",
+           "Innocent is the main competitor | Brexit adds trade friction"),
+    "Denmark": ("GDP/cap: $76K | Strong organic food culture",
+                "Gateway to rest of Scandinavia | EU member"),
+}
+
+
+def display_name(country):
+    return COUNTRY_BLURBS.get(country, (country,))[0]
+
+
+# How a market reads mid-sentence ("exporting to the Netherlands").
+PROSE_NAMES = {"Netherlands": "the Netherlands", "UK": "the UK", "US": "the US"}
+
+
+def prose_name(country):
+    return PROSE_NAMES.get(country, country)
+
+
+def join_names(names):
+    names = list(names)
+    return " and ".join(names) if len(names) < 3 else f"{', '.join(names[:-1])} and {names[-1]}"
+
+
+NEAR = 4        # proximity score from which exporting beats producing locally
+CHART_TOP = 15  # bars in the Q3 score chart; a chart must fit on one page
+
+
+def entry_plan(ranking):
+    # Top three split by proximity: export to the close ones first, consider
+    # a joint venture for the others.
+    prox = scoring.CRITERIA.index("Prox")
+    near = [prose_name(r.country) for r in ranking[:3] if r.criteria[prox] >= NEAR]
+    far = [prose_name(r.country) for r in ranking[:3] if r.criteria[prox] < NEAR]
+    return near, far
+
+
+def sensitivity_blocks(result, limit=10):
+    rows = [["Country", "Base rank", "Ranked #1", f"In top {result.k}"]] + [
+        [country, base, f"{p1:.1%}", f"{pk:.1%}"] for country, base, p1, pk in result.rows()[:limit]]
+    return (
+        spacer(4),
+        para(
+            f"<b>How robust is the ranking?</b> I re-scored every country under {result.draws:,} "
+            f"randomly perturbed weight sets (Dirichlet around the weights above) and counted how "
+            f"often each one lands in the top {result.k}."
+        ),
+        table(rows, widths=[1.3, 0.9, 0.9, 0.9]),
+        spacer(6),
+    )
+
+
+def score_chart(ranking, title=None, width=6.0):
+    return chart("bars", [r.country for r in ranking], [round(r.score, 2) for r in ranking],
+                 title=title, scale=5, width=width)
+
+
+def profile_chart(r):
+    # Same criteria and scale for every country, so the axes are shared.
+    return chart("bars", scoring.CRITERIA_NAMES, r.criteria, scale=5, width=4.5)
+
+
+@spans.traced()
+def q3(ranking, weights=scoring.WEIGHTS, sensitivity=None, company=COMPANY):
+    hdr = ["Country"] + scoring.weight_labels(weights) + ["Score"]
+    rows = [hdr] + [[r.country] + [f"{v:g}" for v in r.criteria] + [f"{r.score:.2f}"]
+                    for r in ranking]
+    blurbs = []
+    for r in ranking[:3]:
+        name, text = COUNTRY_BLURBS.get(r.country, (r.country, ""))
+        text = f" - {text.format(company=company)}" if text else ""
+        blurbs.append(para(f"<b>{r.rank}. {name} ({r.score:.2f})</b>{text}"))
+        blurbs.append(profile_chart(r))
+    return Section("Q3: Top Three Countries", (
+        para(
+            "I made a scoring model with 10 criteria to try to rank the countries objectively. Each country "
+            "gets a 1 to 5 on each factor, multiplied by the weight, then I added them up. I left out "
+            f"Germany, Austria, Switzerland, Luxembourg, France, and Spain since {company} is already there."
+        ),
+        spacer(4),
+        table(rows, widths=[0.95] + [0.47]*10 + [0.52]),
+        spacer(6),
+        score_chart(ranking[:CHART_TOP], "Weighted score out of 5" if len(ranking) <= CHART_TOP
+                    else f"Weighted score out of 5, top {CHART_TOP} of {len(ranking)}"),
+        spacer(6),
+        para(f"<b>Formula:</b> {scoring.formula(weights)}"),
+        chart("stacked", scoring.CRITERIA_NAMES, [round(w * 100, 1) for w in weights], unit="%",
+              title="How the weights split"),
+        spacer(4),
+    ) + tuple(blurbs) + (sensitivity_blocks(sensitivity) if sensitivity else ()))
+
+
+def pick_modes(rows, modes):
+    if modes is None:
+        return rows
+    known = {row[0] for row in rows[1:]}
+    unknown = set(modes) - known
+    if unknown:
+        raise ValueError(f"unknown entry mode(s): {', '.join(sorted(unknown))}")
+    return rows[:1] + [row for row in rows[1:] if row[0] in modes]
+
+
+def recommendation(ranking):
+    near, far = entry_plan(ranking)
+    close = "they are close" if len(near) > 1 else "it is close"
+    if near and far:
+        return (f"start exporting to {join_names(near)} since {close}, then think about a joint venture "
+                f"for {join_names(far)} once there is proof the product sells.")
+    if near:
+        return f"start exporting to {join_names(near)} since {close} to Germany."
+    return (f"start by exporting small volumes to {join_names(far)}, then think about a joint venture "
+            "once there is proof the product sells.")
+
+
+@spans.traced()
+def q4(ranking, modes=None, company=COMPANY):
+    moe = [
+        ["Mode", "What It Is", "Pros", "Cons", f"{company} Fit"],
+        ["Exporting", "Make in Germany,\nship abroad", "Low cost and risk,\neasy to pull out", "Glass is heavy/costly\nto ship, spoilage risk", "Good for now"],
+        ["Licensing", "Local company\nmakes your product", "Almost zero\ninvestment needed", "Lose quality control\nwhich is their whole brand", "Bad fit"],
+        ["Franchising", "Partner runs your\nbusiness system", "Fast growth,\nlocal knowledge", "This is for restaurants\nnot bottled products", "Does not\napply"],
+        ["Joint Venture", "Partner with a\nlocal company", "Shared risk and\nlocal expertise", "Share profits,\npossible conflicts", "Could work for\nfarther markets"],
+        ["FDI", "Build or buy\noperations abroad", "Total control\nover everything", "Way too expensive\nfor 35 people", "Too early"],
+    ]
+    moe = pick_modes(moe, modes)
+    return Section("Q4: Is Exporting the Best Mode of Entry?", (
+        para(
+            f"Exporting makes sense for right now since {company} is so small. But it is not the only "
+            "option. Here are the main modes of entry and how they fit:"
+        ),
+        table(moe, widths=[0.8, 1.05, 1.1, 1.2, 1.15, 0.9]),
+        spacer(6),
+        para(
+            "The criteria you use to pick a country definitely change depending on your mode of entry. "
+            "If you are exporting, proximity and cold-chain logistics matter a ton. But if you do a joint "
+            "venture and produce locally, those barely matter anymore. Instead you need to care about "
+            f"finding the right partner and protecting your brand. My recommendation would be to "
+            f"{recommendation(ranking)}"
+        ),
+    ))
+
+
+def brexit(ranking, text):
+    # Only relevant when the UK is one of the markets being entered.
+    return (bullet(text),) if any(r.country == "UK" for r in ranking[:3]) else ()
+
+
+@spans.traced()
+def q5(ranking):
+    return Section("Q5: Challenges They Will Face", (
+        para("<b>Internal:</b>"),
+        bullet("35 employees is barely enough to run Germany, let alone three new countries"),
+        bullet("Their contract manufacturer needs to be able to handle way more volume"),
+        bullet("Their edgy marketing works in Germany but could offend people in other countries"),
+        bullet("Shipping glass bottles internationally is expensive and they break"),
+        bullet("All the upfront costs (listing fees, marketing, logistics) come before any revenue"),
+        spacer(4),
+        para("<b>External:</b>"),
+        bullet("Getting shelf space at foreign grocery stores is super competitive"),
+        bullet("Innocent has Coca-Cola money and will fight to keep their market share"),
+        *brexit(ranking, "Brexit means extra customs paperwork and possible tariffs for the UK"),
+        bullet("People in different countries like different flavors and portion sizes"),
+        bullet("Currency changes between euros, pounds, and kroner can cut into profits"),
+        spacer(16),
+    ))
+
+
+@spans.traced()
+def sources():
+    srcs = [
+        "True Fruits. Wikipedia. en.wikipedia.org/wiki/True_Fruits",
+        'Hulsink, W., Carvalho, L., Kunz, M., & Laker, A. "True Fruits." Rotterdam School of Management '
+        'Case 813-044-1. The Case Centre / Harvard Course Pack.',
+        'Duhig, A. "True Fruits Potential Viability in the Paraguay Market." Medium.',
+        'Fortune Business Insights. "Smoothie Market Size and Analysis, 2026-2034."',
+        'Market Data Forecast. "Europe Smoothies Market Report, 2034."',
+        'IMARC Group. "Europe Smoothies Market, 2025-2033."',
+        'Worldometer. "GDP per Capita, 2025." worldometers.info/gdp/gdp-per-capita/',
+        'Eurostat. "Population and Population Change Statistics, 2025."',
+        'Mainsights.io. "Eckes-Granini Acquires Majority Stake in True Fruits."',
+        'World Bank. "B-READY 2025 Business Environment Assessment."',
+        'MBA Knowledge Base. "Modes of Entry into International Business." mbaknol.com',
+        "True Fruits Supplemental Spreadsheet. Harvard Course Pack.",
+    ]
+    return Section("Sources", tuple(para(f"{i}. {s}") for i, s in enumerate(srcs, 1)))
+
+
+@spans.traced()
+def s1(title=TITLE):
+    return Slide(title, subtitle="Where Should They Expand Next?",
+                 blocks=(para(SUBTITLE),), kind="title")
+
+
+@spans.traced()
+def s2():
+    d = [["Force", "Rating", "Why"],
+         ["New Entrants", "Moderate", "Cold-chain and shelf space are barriers"],
+         ["Supplier Power", "Mod-High", "Fruit prices jump around"],
+         ["Buyer Power", "High", "Retailers control shelf space"],
+         ["Substitutes", "High", "Juice, kombucha, protein shakes, etc."],
+         ["Rivalry", "High", "Innocent/Coca-Cola, PepsiCo, Danone"]]
+    return Slide("Porter's Five Forces",
+                 subtitle="Global smoothie market: $17.8B, growing about 10%/year",
+                 blocks=(
+                     table(d, widths=[1.1, 0.85, 3.0]),
+                     spacer(4),
+                     para("Overall: moderately attractive industry"),
+                 ))
+
+
+@spans.traced()
+def s3():
+    d = [["Strengths", "Weaknesses"],
+         ["- 70%+ German market share\n- All-natural, glass bottles\n- Bold brand\n- Eckes-Granini backing",
+          "- 35 employees\n- Outsourced production\n- Controversial marketing\n- Limited intl experience"],
+         ["Opportunities", "Threats"],
+         ["- EU market growing 4.4%/yr\n- Health trend keeps building\n- Untapped markets nearby",
+          "- Innocent has Coca-Cola\n- Fruit price swings\n- Ads could backfire abroad"]]
+    return Slide("SWOT Analysis", blocks=(table(d, widths=[2.8, 2.8], header_rows=(0, 2)),))
+
+
+@spans.traced()
+def s4(funnel=None):
+    counts = funnel.counts() if funnel else screening.CASE_COUNTS
+    rounds = funnel.stages if funnel else screening.ROUNDS
+    steps = funnel_steps(counts, funnel is None, "~")
+    return Slide(f"Market Screening: {counts[0]} to {counts[-1]}", blocks=tuple(
+        bullet(f"<b>{rnd.name} ({a} to {b}):</b> {rnd.criteria}") for rnd, (a, b) in zip(rounds, steps)
+    ) + (
+        spacer(8),
+        para("<b>Most important filters:</b>"),
+        bullet("GDP per capita - premium product needs people who can pay"),
+        bullet("Cold-chain infrastructure - smoothies spoil without refrigeration"),
+        bullet("Proximity to Germany - keeps shipping costs and spoilage down"),
+    ))
+
+
+@spans.traced()
+def s5(ranking):
+    d = [["Rank", "Country", "Score", "Why"]] + [
+        [str(r.rank), r.country, f"{r.score:.2f}", SLIDE_REASONS.get(r.country, "")]
+        for r in ranking[:5]]
+    return Slide("Top Country Rankings",
+                 subtitle="Weighted scoring model with 10 criteria, each scored 1-5",
+                 blocks=(table(d, widths=[0.5, 1.1, 0.6, 3.0]), spacer(8),
+                         score_chart(ranking[:5], width=5.5)))
+
+
+@spans.traced()
+def s6(ranking):
+    blocks = []
+    for r in ranking[:3]:
+        if blocks:
+            blocks.append(spacer(3))
+        blocks.append(para(f"<b>{display_name(r.country)}</b>"))
+        blocks.extend(bullet(fact) for fact in SLIDE_FACTS.get(r.country, ()))
+    return Slide("Why These Three Countries?", blocks=tuple(blocks))
+
+
+@spans.traced()
+def s7(ranking, modes=None, company=COMPANY):
+    d = [["Mode", "Risk", "Cost", "Control", f"Fit for {company}"],
+         ["Exporting", "Low", "Low", "Low", "Good for now"],
+         ["Licensing", "Low", "Low", "Low", "Bad - quality risk"],
+         ["Franchising", "Med", "Low", "Med", "Does not apply"],
+         ["Joint Venture", "Med", "Med", "Shared", "Good for far markets"],
+         ["FDI", "High", "High", "Full", "Too early"]]
+    d = pick_modes(d, modes)
+    near, far = entry_plan(ranking)
+    plan = ([bullet(f"Start with exporting to {join_names(near)}")] if near else []) + \
+        ([bullet(f"Consider a joint venture for {join_names(far)} once demand is proven")] if far else [])
+    return Slide("Modes of Entry", blocks=(
+        table(d, widths=[1.0, 0.55, 0.55, 0.65, 1.5]),
+        spacer(6),
+        *plan,
+    ))
+
+
+@spans.traced()
+def s8(ranking):
+    first, *rest = [r.country for r in ranking[:3]]
+    order = f"Go {first} first" + "".join(f", then {name}" for name in rest)
+    return Slide("Challenges and Recommendations", blocks=(
+        para("<b>Internal</b>"),
+        bullet("Need to hire - 35 people is not enough"),
+        bullet("Manufacturer has to scale up production"),
+        bullet("Marketing needs to be toned down for new cultures"),
+        bullet("Glass bottles are heavy and fragile to ship"),
+        spacer(4),
+        para("<b>External</b>"),
+        bullet("Getting shelf space is really competitive"),
+        bullet("Innocent/Coca-Cola will push back hard"),
+        *brexit(ranking, "Brexit complicates UK trade"),
+        bullet("Different countries have different taste preferences"),
+        spacer(4),
+        para(f"<b>Plan:</b> {order}"),
+    ))
+
+
+def build_document(weights=scoring.WEIGHTS, countries=scoring.COUNTRIES, matrix=scoring.SCORES,
+                   funnel=None, sensitivity=None, company=COMPANY, modes=None):
+    ranking = scoring.rank(countries, matrix, weights)
+    title = f"{company}: International Expansion"
+    return Document(
+        title, SUBTITLE,
+        sections=(q1(company), q2(funnel, company), q3(ranking, weights, sensitivity, company),
+                  q4(ranking, modes, company), q5(ranking), sources()),
+        slides=(s1(title), s2(), s3(), s4(funnel), s5(ranking), s6(ranking), s7(ranking, modes, company),
+                s8(ranking)),
+    )
@@ -0,0 +1,261 @@
+import functools
+import hashlib
+import io
+import math
+import os
+import shutil
+
+import fonts
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+IMAGE_CACHE_DIR = os.path.join(BASE, ".build_cache", "charts")
+IMAGE_CACHE_LIMIT = 512       # PNGs kept on disk, least recently used go first
+
+BLUE = "#4472C4"
+GRAY = "#666666"
+LIGHT_GRAY = "#cccccc"
+WHITE = "#ffffff"
+PALETTE = ("#4472C4", "#ED7D31", "#A5A5A5", "#FFC000", "#5B9BD5",
+           "#70AD47", "#264478", "#9E480E", "#636363", "#997300")
+
+LABEL_WIDTH = 80          # points reserved for category labels
+VALUE_WIDTH = 34          # points reserved for the value after a bar
+ROW = 18                  # points per bar when the height is not given
+TITLE = 18
+AXIS = 14
+TEXT = 8
+
+# Charts are laid out once into drawing ops in points, origin bottom left:
+#   ("rect", x, y, w, h, fill)
+#   ("line", x1, y1, x2, y2, color, width)
+#   ("text", x, y, text, size, color, anchor, bold)   anchor: start/middle/end
+# The static ops (title, axes, gridlines, category labels, legend) depend only
+# on the labels, scale and size; the marks carry the data. Backends draw the
+# two lists; the PDF one keeps each as a form XObject.
+
+
+def digest(*parts):
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def nice_ceiling(value):
+    if value <= 0:
+        return 1.0
+    magnitude = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 2.5, 5, 10):
+        if value <= step * magnitude:
+            return step * magnitude
+    return 10 * magnitude
+
+
+def fmt_value(value, unit=""):
+    return f"{value:,.2f}".rstrip("0").rstrip(".") + unit
+
+
+def size(chart):
+    width = chart.width * 72
+    if chart.height:
+        return width, chart.height * 72
+    rows = 1 if chart.kind == "stacked" else len(chart.labels)
+    extra = (TITLE if chart.title else 4) + (AXIS if chart.kind == "bars" else 4)
+    if chart.kind == "stacked":
+        extra += 14 * math.ceil(len(chart.labels) / 5) + 8      # legend
+        rows = 1.6
+    return width, rows * ROW + extra
+
+
+@functools.lru_cache(maxsize=256)
+def layout(chart):
+    w, h = size(chart)
+    static, marks = [], []
+    top = h - (TITLE if chart.title else 4)
+    if chart.title:
+        static.append(("text", 0, h - 11, chart.title, 10, "#333333", "start", True))
+    {"bars": _bars, "stacked": _stacked, "funnel": _funnel}[chart.kind](chart, w, top, static, marks)
+    return w, h, tuple(static), tuple(marks)
+
+
+def _bars(chart, w, top, static, marks):
+    scale = chart.scale or nice_ceiling(max(chart.values, default=0))
+    x0, x1, bottom = LABEL_WIDTH, w - VALUE_WIDTH, AXIS
+    band = (top - bottom) / max(len(chart.labels), 1)
+    ticks = 5 if scale % 5 else int(scale) if scale <= 10 else 5
+    for i in range(ticks + 1):
+        x = x0 + (x1 - x0) * i / ticks
+        static.append(("line", x, bottom, x, top, LIGHT_GRAY, 0.5))
+        static.append(("text", x, bottom - 9, fmt_value(scale * i / ticks), TEXT - 1, GRAY, "middle", False))
+    static.append(("line", x0, bottom, x0, top, GRAY, 0.75))
+    for i, label in enumerate(chart.labels):
+        mid = top - band * (i + 0.5)
+        static.append(("text", x0 - 5, mid - TEXT * 0.35, label, TEXT, "#333333", "end", False))
+    for i, value in enumerate(chart.values):
+        mid = top - band * (i + 0.5)
+        length = (x1 - x0) * max(0.0, min(value / scale, 1.0))
+        marks.append(("rect", x0, mid - band * 0.31, length, band * 0.62, BLUE))
+        marks.append(("text", x0 + length + 3, mid - TEXT * 0.35, fmt_value(value, chart.unit),
+                      TEXT, "#333333", "start", False))
+
+
+def _stacked(chart, w, top, static, marks):
+    bar = 1.6 * ROW
+    total = sum(chart.values) or 1.0
+    x = 0.0
+    for i, value in enumerate(chart.values):
+        length = w * value / total
+        marks.append(("rect", x, top - bar, length, bar, PALETTE[i % len(PALETTE)]))
+        if length > 24:
+            marks.append(("text", x + length / 2, top - bar / 2 - TEXT * 0.35, fmt_value(value, chart.unit),
+                          TEXT, WHITE, "middle", True))
+        x += length
+    # Legend: five entries per row under the bar.
+    cell = w / 5
+    for i, label in enumerate(chart.labels):
+        lx, ly = cell * (i % 5), top - bar - 16 - 14 * (i // 5)
+        static.append(("rect", lx, ly, 8, 8, PALETTE[i % len(PALETTE)]))
+        static.append(("text", lx + 12, ly + 1, label, TEXT, "#333333", "start", False))
+
+
+def _funnel(chart, w, top, static, marks):
+    first = max(chart.values, default=0) or 1.0
+    x0, bottom = LABEL_WIDTH, 4
+    center = (x0 + w) / 2
+    band = (top - bottom) / max(len(chart.labels), 1)
+    for i, label in enumerate(chart.labels):
+        mid = top - band * (i + 0.5)
+        static.append(("text", x0 - 5, mid - TEXT * 0.35, label, TEXT, "#333333", "end", False))
+    for i, value in enumerate(chart.values):
+        mid = top - band * (i + 0.5)
+        length = max((w - x0) * value / first, 30)
+        marks.append(("rect", center - length / 2, mid - band * 0.4, length, band * 0.8,
+                      PALETTE[0] if i == len(chart.values) - 1 else "#8FAADC"))
+        marks.append(("text", center, mid - TEXT * 0.35, fmt_value(value, chart.unit), TEXT + 1, WHITE, "middle", True))
+
+
+def static_key(chart):
+    w, h, static, _ = layout(chart)
+    return digest(w, h, static)
+
+
+def chart_key(chart):
+    return digest(chart)
+
+
+@functools.lru_cache(maxsize=1)
+def _code_hash():
+    # Cached images are only valid for the layout code and fonts that drew them.
+    with open(os.path.abspath(__file__), "rb") as f:
+        h = hashlib.sha256(f.read())
+    h.update(repr(fonts.font_files()).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=16)
+def _pil_font(px, bold):
+    from PIL import ImageFont
+    path = fonts.find_font_file(fonts.FAMILY_FILES[fonts.SERIF]["bold" if bold else "regular"])
+    if path:
+        return ImageFont.truetype(path, px)
+    return ImageFont.load_default(px)
+
+
+def draw_image(chart, dpi=200):
+    from PIL import Image, ImageDraw
+
+    w, h, static, marks = layout(chart)
+    s = dpi / 72
+    image = Image.new("RGB", (round(w * s), round(h * s)), WHITE)
+    draw = ImageDraw.Draw(image)
+    anchors = {"start": "ls", "middle": "ms", "end": "rs"}
+    for op in static + marks:
+        if op[0] == "rect":
+            _, x, y, rw, rh, fill = op
+            if rw > 0 and rh > 0:
+                draw.rectangle([x * s, (h - y - rh) * s, (x + rw) * s, (h - y) * s], fill=fill)
+        elif op[0] == "line":
+            _, x1, y1, x2, y2, color, width = op
+            draw.line([x1 * s, (h - y1) * s, x2 * s, (h - y2) * s], fill=color, width=max(1, round(width * s)))
+        else:
+            _, x, y, text, pt, color, anchor, bold = op
+            draw.text((x * s, (h - y) * s), text, fill=color, font=_pil_font(round(pt * s), bold),
+                      anchor=anchors[anchor])
+    buf = io.BytesIO()
+    image.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def image_dir():
+    # One directory per version of this file, so a layout change strands a
+    # whole directory that prune_images() can drop at once.
+    return os.path.join(IMAGE_CACHE_DIR, _code_hash())
+
+
+def prune_images(limit=IMAGE_CACHE_LIMIT):
+    current = image_dir()
+    try:
+        names = os.listdir(IMAGE_CACHE_DIR)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(IMAGE_CACHE_DIR, name)
+        if path == current:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    files = []
+    for entry in os.scandir(current):
+        try:
+            files.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            pass
+    files.sort()
+    for _, path in files[:max(len(files) - limit, 0)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_images = {}
+_writes = 0
+
+
+def png(chart, dpi=200):
+    # Raster version for DOCX/PPTX, cached by the chart's data hash in
+    # memory and on disk, so identical charts are drawn once per machine.
+    # A hit touches the file so pruning keeps the images still in use.
+    global _writes
+    key = digest(chart_key(chart), dpi)
+    data = _images.get(key)
+    if data is not None:
+        return data
+    path = os.path.join(image_dir(), f"{key}.png")
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        data = draw_image(chart, dpi)
+        try:
+            os.makedirs(image_dir(), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            if _writes % 64 == 0:
+                prune_images()
+            _writes += 1
+        except OSError:
+            pass
+    else:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    if len(_images) >= 512:
+        _images.pop(next(iter(_images)))
+    _images[key] = data
+    return data
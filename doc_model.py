@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+import html
+import re
+
+_TAG = re.compile(r"(</?[biu]>)")
+
+
+@dataclass(frozen=True)
+class Run:
+    text: str
+    bold: bool = False
+    italic: bool = False
+    underline: bool = False
+
+
+@dataclass(frozen=True)
+class Paragraph:
+    runs: tuple
+
+    @property
+    def text(self):
+        return plain(self.runs)
+
+    @property
+    def bold(self):
+        return all(r.bold for r in self.runs if r.text.strip())
+
+
+@dataclass(frozen=True)
+class Bullet:
+    runs: tuple
+
+    @property
+    def text(self):
+        return plain(self.runs)
+
+
+@dataclass(frozen=True)
+class Heading:
+    text: str
+
+
+@dataclass(frozen=True)
+class Table:
+    rows: tuple
+    widths: tuple = None          # inches, used by the PDF backend
+    header_rows: tuple = (0,)
+
+    @property
+    def header(self):
+        return self.rows[0]
+
+    @property
+    def body(self):
+        return self.rows[1:]
+
+
+@dataclass(frozen=True)
+class Spacer:
+    height: float                 # points
+
+
+@dataclass(frozen=True)
+class Chart:
+    kind: str                     # "bars", "stacked" or "funnel"
+    labels: tuple
+    values: tuple
+    title: str = None
+    scale: float = None           # value at full bar length; None rounds up the largest
+    unit: str = ""                # printed after each value
+    width: float = 6.0            # inches
+    height: float = None          # inches; None sizes to the number of rows
+
+
+@dataclass(frozen=True)
+class Section:
+    title: str
+    blocks: tuple
+
+
+@dataclass(frozen=True)
+class Slide:
+    title: str
+    blocks: tuple = ()
+    subtitle: str = None
+    kind: str = "content"         # "content" or "title"
+
+
+@dataclass(frozen=True)
+class Document:
+    title: str
+    subtitle: str
+    sections: tuple
+    slides: tuple
+
+
+def parse_runs(markup):
+    # <b>, <i> and <u> are the only inline tags the content uses; entities
+    # such as &bull; are resolved here so the backends only see plain text.
+    runs = []
+    state = {"b": False, "i": False, "u": False}
+    for tok in _TAG.split(markup):
+        if not tok:
+            continue
+        if _TAG.fullmatch(tok):
+            state[tok.strip("</>")] = not tok.startswith("</")
+            continue
+        runs.append(Run(html.unescape(tok), state["b"], state["i"], state["u"]))
+    return tuple(runs)
+
+
+def plain(runs):
+    return "".join(r.text for r in runs)
+
+
+def para(markup):
+    return Paragraph(parse_runs(markup))
+
+
+def bullet(markup):
+    return Bullet(parse_runs(markup))
+
+
+def heading(text):
+    return Heading(text)
+
+
+def table(rows, widths=None, header_rows=(0,)):
+    return Table(tuple(tuple(str(c) for c in row) for row in rows),
+                 tuple(widths) if widths else None, tuple(header_rows))
+
+
+def spacer(height):
+    return Spacer(height)
+
+
+def chart(kind, labels, values, title=None, scale=None, unit="", width=6.0, height=None):
+    if kind not in ("bars", "stacked", "funnel"):
+        raise ValueError(f"unknown chart kind {kind!r}")
+    if len(labels) != len(values):
+        raise ValueError(f"{len(labels)} labels for {len(values)} values")
+    return Chart(kind, tuple(str(l) for l in labels), tuple(float(v) for v in values),
+                 title, scale, unit, width, height)
@@ -0,0 +1,273 @@
+import hashlib
+import zipfile
+from xml.sax.saxutils import escape
+
+import charts
+import doc_model as dm
+import fonts
+import spans
+from outputs import DOCX_PATH
+
+# A DOCX writer that streams word/document.xml straight into the zip: each
+# block becomes a few lines of XML written as it is reached, so memory does
+# not grow with the document. Formatting lives in the predefined styles
+# below (the same look render_docx() gives), and runs only carry a character
+# style or a bold/italic/underline toggle. Images are held until
+# document.xml is closed, since a zip takes one open entry at a time; charts
+# repeat, so they are stored once per distinct image.
+
+NS_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS_WP = "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_PIC = "http://schemas.openxmlformats.org/drawingml/2006/picture"
+REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+HEADER = "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+EMU_PER_INCH = 914400
+TEXT_WIDTH = 8640             # twips between the 1.25" margins of a Letter page
+FLUSH = 1 << 16
+
+
+def _rfonts(name):
+    return f'<w:rFonts w:ascii="{name}" w:hAnsi="{name}" w:eastAsia="{name}" w:cs="{name}"/>'
+
+
+STYLES = f"""{HEADER}<w:styles xmlns:w="{NS_W}">
+<w:docDefaults><w:rPrDefault><w:rPr>{_rfonts(fonts.SERIF)}<w:sz w:val="22"/><w:szCs w:val="22"/>\
+<w:lang w:val="en-US" w:eastAsia="en-US" w:bidi="ar-SA"/></w:rPr></w:rPrDefault>\
+<w:pPrDefault><w:pPr><w:spacing w:after="200" w:line="276" w:lineRule="auto"/></w:pPr></w:pPrDefault></w:docDefaults>
+<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/>\
+<w:pPr><w:spacing w:after="120" w:line="276" w:lineRule="auto"/></w:pPr><w:rPr>{_rfonts(fonts.SERIF)}<w:sz w:val="24"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:qFormat/>\
+<w:pPr><w:jc w:val="center"/></w:pPr><w:rPr><w:b/><w:sz w:val="32"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Subtitle"><w:name w:val="Subtitle"/><w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:qFormat/>\
+<w:pPr><w:jc w:val="center"/></w:pPr><w:rPr><w:color w:val="646464"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/><w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:qFormat/>\
+<w:pPr><w:keepNext/><w:keepLines/><w:spacing w:before="200" w:after="0"/><w:outlineLvl w:val="1"/></w:pPr>\
+<w:rPr><w:b/><w:bCs/><w:color w:val="4F81BD"/><w:sz w:val="26"/><w:szCs w:val="26"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Heading3"><w:name w:val="heading 3"/><w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:qFormat/>\
+<w:pPr><w:keepNext/><w:keepLines/><w:spacing w:before="200" w:after="0"/><w:outlineLvl w:val="2"/></w:pPr>\
+<w:rPr><w:b/><w:bCs/><w:color w:val="4F81BD"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="ListBullet"><w:name w:val="List Bullet"/><w:basedOn w:val="Normal"/>\
+<w:pPr><w:numPr><w:numId w:val="1"/></w:numPr><w:contextualSpacing/></w:pPr></w:style>
+<w:style w:type="paragraph" w:customStyle="1" w:styleId="TableText"><w:name w:val="Table Text"/><w:basedOn w:val="Normal"/>\
+<w:rPr><w:sz w:val="20"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:customStyle="1" w:styleId="TableHeader"><w:name w:val="Table Header"/><w:basedOn w:val="TableText"/>\
+<w:rPr><w:b/></w:rPr></w:style>
+<w:style w:type="character" w:default="1" w:styleId="DefaultParagraphFont"><w:name w:val="Default Paragraph Font"/><w:uiPriority w:val="1"/><w:semiHidden/></w:style>
+<w:style w:type="character" w:styleId="Strong"><w:name w:val="Strong"/><w:basedOn w:val="DefaultParagraphFont"/><w:qFormat/><w:rPr><w:b/><w:bCs/></w:rPr></w:style>
+<w:style w:type="character" w:styleId="Emphasis"><w:name w:val="Emphasis"/><w:basedOn w:val="DefaultParagraphFont"/><w:qFormat/><w:rPr><w:i/><w:iCs/></w:rPr></w:style>
+<w:style w:type="table" w:default="1" w:styleId="TableNormal"><w:name w:val="Normal Table"/><w:semiHidden/>\
+<w:tblPr><w:tblInd w:w="0" w:type="dxa"/><w:tblCellMar><w:top w:w="0" w:type="dxa"/><w:left w:w="108" w:type="dxa"/>\
+<w:bottom w:w="0" w:type="dxa"/><w:right w:w="108" w:type="dxa"/></w:tblCellMar></w:tblPr></w:style>
+<w:style w:type="table" w:styleId="TableGrid"><w:name w:val="Table Grid"/><w:basedOn w:val="TableNormal"/>\
+<w:pPr><w:spacing w:after="0" w:line="240" w:lineRule="auto"/></w:pPr><w:tblPr><w:tblBorders>\
+<w:top w:val="single" w:sz="4" w:space="0" w:color="auto"/><w:left w:val="single" w:sz="4" w:space="0" w:color="auto"/>\
+<w:bottom w:val="single" w:sz="4" w:space="0" w:color="auto"/><w:right w:val="single" w:sz="4" w:space="0" w:color="auto"/>\
+<w:insideH w:val="single" w:sz="4" w:space="0" w:color="auto"/><w:insideV w:val="single" w:sz="4" w:space="0" w:color="auto"/>\
+</w:tblBorders></w:tblPr></w:style>
+</w:styles>"""
+
+NUMBERING = f"""{HEADER}<w:numbering xmlns:w="{NS_W}"><w:abstractNum w:abstractNumId="0">\
+<w:multiLevelType w:val="singleLevel"/><w:lvl w:ilvl="0"><w:start w:val="1"/><w:numFmt w:val="bullet"/>\
+<w:pStyle w:val="ListBullet"/><w:lvlText w:val="•"/><w:lvlJc w:val="left"/>\
+<w:pPr><w:ind w:left="360" w:hanging="360"/></w:pPr></w:lvl></w:abstractNum>\
+<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num></w:numbering>"""
+
+SETTINGS = f'{HEADER}<w:settings xmlns:w="{NS_W}"><w:defaultTabStop w:val="720"/><w:compat/></w:settings>'
+
+CONTENT_TYPES = f"""{HEADER}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>\
+<Default Extension="xml" ContentType="application/xml"/><Default Extension="png" ContentType="image/png"/>\
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>\
+<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>\
+<Override PartName="/word/numbering.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>\
+<Override PartName="/word/settings.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.settings+xml"/>\
+<Override PartName="/docProps/core.xml" ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>\
+</Types>"""
+
+PACKAGE_RELS = f"""{HEADER}<Relationships xmlns="{NS_REL}">\
+<Relationship Id="rId1" Type="{REL_TYPE}/officeDocument" Target="word/document.xml"/>\
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" Target="docProps/core.xml"/>\
+</Relationships>"""
+
+SECTION = ('<w:sectPr><w:pgSz w:w="12240" w:h="15840"/><w:pgMar w:top="1440" w:right="1800" w:bottom="1440" '
+           'w:left="1800" w:header="720" w:footer="720" w:gutter="0"/><w:cols w:space="720"/></w:sectPr>')
+
+
+def core_properties(title):
+    return (f'{HEADER}<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            f'xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:title>{escape(title)}</dc:title></cp:coreProperties>')
+
+
+def text_xml(text):
+    # Line breaks and tabs are elements in WordprocessingML, as python-docx
+    # writes them for run.text.
+    parts = []
+    for i, line in enumerate(text.split("\n")):
+        if i:
+            parts.append("<w:br/>")
+        for j, chunk in enumerate(line.split("\t")):
+            if j:
+                parts.append("<w:tab/>")
+            if chunk:
+                parts.append(f'<w:t xml:space="preserve">{escape(chunk)}</w:t>')
+    return "".join(parts)
+
+
+def run_xml(run):
+    flags = (run.bold, run.italic, run.underline)
+    if flags == (True, False, False):
+        props = '<w:rPr><w:rStyle w:val="Strong"/></w:rPr>'
+    elif flags == (False, True, False):
+        props = '<w:rPr><w:rStyle w:val="Emphasis"/></w:rPr>'
+    elif any(flags):
+        props = ("<w:rPr>" + ("<w:b/>" if run.bold else "") + ("<w:i/>" if run.italic else "")
+                 + ('<w:u w:val="single"/>' if run.underline else "") + "</w:rPr>")
+    else:
+        props = ""
+    return f"<w:r>{props}{text_xml(run.text)}</w:r>"
+
+
+def paragraph_xml(runs, style=None):
+    ppr = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f"<w:p>{ppr}{''.join(map(run_xml, runs))}</w:p>"
+
+
+class DocxWriter:
+    def __init__(self, path, title="", compresslevel=None, image_filter=None):
+        self.zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+        # Everything but the body, its image parts and their relationships is
+        # fixed, so it goes in up front.
+        self.zip.writestr("[Content_Types].xml", CONTENT_TYPES)
+        self.zip.writestr("_rels/.rels", PACKAGE_RELS)
+        self.zip.writestr("docProps/core.xml", core_properties(title))
+        self.zip.writestr("word/styles.xml", STYLES)
+        self.zip.writestr("word/numbering.xml", NUMBERING)
+        self.zip.writestr("word/settings.xml", SETTINGS)
+        self.image_filter = image_filter
+        self.images = {}            # sha1 -> (rId, part name, bytes)
+        self.drawings = 0
+        self._pending = []
+        self._size = 0
+        self.stream = self.zip.open("word/document.xml", "w", force_zip64=True)
+        self.write(f'{HEADER}<w:document xmlns:w="{NS_W}" xmlns:r="{NS_R}" xmlns:wp="{NS_WP}" '
+                   f'xmlns:a="{NS_A}" xmlns:pic="{NS_PIC}"><w:body>')
+
+    def write(self, xml):
+        self._pending.append(xml)
+        self._size += len(xml)
+        if self._size >= FLUSH:
+            self.flush()
+
+    def flush(self):
+        self.stream.write("".join(self._pending).encode("utf-8"))
+        self._pending, self._size = [], 0
+
+    def paragraph(self, runs, style=None):
+        self.write(paragraph_xml(runs, style))
+
+    def text(self, text, style=None):
+        self.write(paragraph_xml((dm.Run(text),), style))
+
+    def heading(self, text, level):
+        self.text(text, f"Heading{level}")
+
+    def bullet(self, runs):
+        self.paragraph(runs, "ListBullet")
+
+    def table(self, header, rows, header_rows=(0,)):
+        cols = len(header)
+        width = TEXT_WIDTH // cols
+        cell_pr = f'<w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>'
+        self.write('<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:type="auto" w:w="0"/>'
+                   '<w:jc w:val="left"/><w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0" w:firstColumn="1" '
+                   'w:lastColumn="0" w:noHBand="0" w:noVBand="1"/></w:tblPr><w:tblGrid>'
+                   + f'<w:gridCol w:w="{width}"/>' * cols + "</w:tblGrid>")
+        for i, values in enumerate([header, *rows]):
+            style = "TableHeader" if i in header_rows else "TableText"
+            self.write("<w:tr>" + "".join(
+                f'<w:tc>{cell_pr}<w:p><w:pPr><w:pStyle w:val="{style}"/></w:pPr>'
+                f'<w:r>{text_xml(str(v))}</w:r></w:p></w:tc>' for v in values) + "</w:tr>")
+        self.write("</w:tbl>")
+
+    def picture(self, data, width, height, name="image.png"):
+        # width/height in inches; identical images share one part.
+        if self.image_filter:
+            data = self.image_filter(data)
+        sha = hashlib.sha1(data).hexdigest()
+        if sha not in self.images:
+            n = len(self.images) + 1
+            self.images[sha] = (f"rIdImg{n}", f"media/image{n}.png", data)
+        rid = self.images[sha][0]
+        self.drawings += 1
+        cx, cy = int(width * EMU_PER_INCH), int(height * EMU_PER_INCH)
+        self.write(
+            f'<w:p><w:r><w:drawing><wp:inline><wp:extent cx="{cx}" cy="{cy}"/>'
+            f'<wp:docPr id="{self.drawings}" name="Picture {self.drawings}"/><wp:cNvGraphicFramePr>'
+            f'<a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr><a:graphic>'
+            f'<a:graphicData uri="{NS_PIC}"><pic:pic><pic:nvPicPr><pic:cNvPr id="0" name="{escape(name)}"/>'
+            f'<pic:cNvPicPr/></pic:nvPicPr><pic:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/>'
+            f'</a:stretch></pic:blipFill><pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/>'
+            f'</a:xfrm><a:prstGeom prst="rect"/></pic:spPr></pic:pic></a:graphicData></a:graphic>'
+            f'</wp:inline></w:drawing></w:r></w:p>')
+
+    def block(self, block):
+        # The same mapping as build_docs.add_block().
+        if isinstance(block, dm.Heading):
+            self.heading(block.text, 3)
+        elif isinstance(block, dm.Bullet):
+            self.bullet(block.runs)
+        elif isinstance(block, dm.Paragraph):
+            self.paragraph(block.runs)
+        elif isinstance(block, dm.Table):
+            self.table(block.header, block.body, block.header_rows)
+            self.write("<w:p/>")
+        elif isinstance(block, dm.Chart):
+            width, height = charts.size(block)
+            self.picture(charts.png(block), block.width, block.width * height / width)
+        elif isinstance(block, dm.Spacer):
+            pass
+        else:
+            raise TypeError(f"Unsupported block: {type(block).__name__}")
+
+    def close(self):
+        self.write(SECTION + "</w:body></w:document>")
+        self.flush()
+        self.stream.close()
+        rels = [f'<Relationship Id="rIdStyles" Type="{REL_TYPE}/styles" Target="styles.xml"/>',
+                f'<Relationship Id="rIdNumbering" Type="{REL_TYPE}/numbering" Target="numbering.xml"/>',
+                f'<Relationship Id="rIdSettings" Type="{REL_TYPE}/settings" Target="settings.xml"/>']
+        for rid, part, data in self.images.values():
+            self.zip.writestr(f"word/{part}", data)
+            rels.append(f'<Relationship Id="{rid}" Type="{REL_TYPE}/image" Target="{part}"/>')
+        self.zip.writestr("word/_rels/document.xml.rels",
+                          f'{HEADER}<Relationships xmlns="{NS_REL}">{"".join(rels)}</Relationships>')
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:
+            self.stream.close()
+            self.zip.close()
+        return False
+
+
+def render_docx_stream(document, path=DOCX_PATH, optimize=False):
+    image_filter = None
+    if optimize:
+        from optimize import palettize_png
+        image_filter = palettize_png
+    with DocxWriter(path, document.title, 9 if optimize else None, image_filter) as out:
+        out.text(document.title, "Title")
+        out.text(document.subtitle, "Subtitle")
+        for section in document.sections:
+            with spans.span("docx section", section.title):
+                out.heading(section.title, 2)
+                for block in section.blocks:
+                    out.block(block)
@@ -0,0 +1,98 @@
+import os
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+
+SERIF = "Times New Roman"
+SANS = "Calibri"
+
+# Where TrueType files are looked up, first match wins. FONT_PATH (os.pathsep
+# separated) comes first so a build box can pin exact font files.
+FONT_DIRS = [
+    *filter(None, os.environ.get("FONT_PATH", "").split(os.pathsep)),
+    os.path.join(BASE, "fonts"),
+    os.path.expanduser("~/.fonts"),
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    "/Library/Fonts",
+    "C:\\Windows\\Fonts",
+]
+
+FAMILY_FILES = {
+    SERIF: {
+        "regular": ("times.ttf", "Times New Roman.ttf", "LiberationSerif-Regular.ttf"),
+        "bold": ("timesbd.ttf", "Times New Roman Bold.ttf", "LiberationSerif-Bold.ttf"),
+        "italic": ("timesi.ttf", "Times New Roman Italic.ttf", "LiberationSerif-Italic.ttf"),
+        "boldItalic": ("timesbi.ttf", "Times New Roman Bold Italic.ttf", "LiberationSerif-BoldItalic.ttf"),
+    },
+}
+
+# Base-14 fallback when the TrueType files are not installed.
+BASE14 = {SERIF: ("Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic")}
+
+_file_index = {}
+_walker = None
+
+
+def _scan():
+    # Yields font files directory by directory, in FONT_DIRS order.
+    for root_dir in FONT_DIRS:
+        for root, _, files in os.walk(root_dir):
+            for name in files:
+                yield name.lower(), os.path.join(root, name)
+
+
+def find_font_file(candidates):
+    # The font directories are walked on the first lookup, and only as far
+    # as the first file matching a candidate; later lookups resume there.
+    global _walker
+    wanted = [name.lower() for name in candidates]
+    if _walker is None:
+        _walker = _scan()
+    while True:
+        for name in wanted:
+            if name in _file_index:
+                return _file_index[name]
+        for name, path in _walker:
+            _file_index.setdefault(name, path)
+            if name in wanted:
+                break
+        else:
+            return None
+
+
+def font_files():
+    # The file each style resolves to, with its size and mtime. Part of the
+    # build cache key, so pointing FONT_PATH elsewhere or installing the
+    # fonts rebuilds outputs made with the old ones.
+    files = []
+    for family, styles in sorted(FAMILY_FILES.items()):
+        for style, candidates in sorted(styles.items()):
+            path = find_font_file(candidates)
+            st = os.stat(path) if path else None
+            files.append((family, style, path, st and st.st_size, st and st.st_mtime_ns))
+    return files
+
+
+def pdf_fonts(family=SERIF):
+    # Returns (regular, bold, italic) font names for reportlab. TrueType
+    # fonts are embedded as subsets by reportlab; without the files we fall
+    # back to the base-14 fonts, which are not embedded at all.
+    from reportlab.lib.fonts import addMapping
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    files = {style: find_font_file(c) for style, c in FAMILY_FILES.get(family, {}).items()}
+    if not files or not all(files.values()):
+        return BASE14[family][:3]
+
+    names = {style: f"{family}-{style}".replace(" ", "") for style in files}
+    # Registered fonts live as long as the process, so batch, serve and watch
+    # workers parse each face once and reuse it for every render.
+    registered = pdfmetrics.getRegisteredFontNames()
+    for style, path in files.items():
+        if names[style] not in registered:
+            pdfmetrics.registerFont(TTFont(names[style], path))
+    # Map <b>/<i> in paragraph markup onto the right face.
+    for bold, italic, style in ((0, 0, "regular"), (1, 0, "bold"), (0, 1, "italic"), (1, 1, "boldItalic")):
+        addMapping(names["regular"], bold, italic, names[style])
+    return names["regular"], names["bold"], names["italic"]
@@ -0,0 +1,279 @@
+from dataclasses import dataclass
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+
+import numpy as np
+
+import scoring
+
+# ISO 3166 alpha-3 codes for the markets in the hand-scored table; extracts
+# are joined on code, and these give the names the write-up uses.
+CODES = {
+    "NLD": "Netherlands", "GBR": "UK", "DNK": "Denmark", "SWE": "Sweden", "BEL": "Belgium",
+    "NOR": "Norway", "ITA": "Italy", "CAN": "Canada", "POL": "Poland", "JPN": "Japan",
+}
+
+
+@dataclass(frozen=True)
+class Binning:
+    criterion: str
+    indicator: str
+    thresholds: tuple = None      # four ascending cut points; None bins by quintile
+    higher_is_better: bool = True
+
+
+# How each criterion's 1-5 score comes out of the raw indicators.
+BINNING = (
+    Binning("GDP", "gdp_per_capita", (20_000, 35_000, 50_000, 65_000)),
+    Binning("Pop", "population", (5e6, 10e6, 30e6, 60e6)),
+    Binning("Mkt", "smoothie_market_usd"),
+    Binning("Prox", "distance_km", (500, 1000, 2000, 5000), higher_is_better=False),
+    Binning("Cold", "cold_chain", (2.5, 3.0, 3.5, 3.8)),
+    Binning("Retail", "modern_retail_share", (0.4, 0.5, 0.6, 0.7)),
+    Binning("Health", "health_index"),
+    Binning("Comp", "competitor_share", higher_is_better=False),
+    Binning("Ease", "bready_score", (50, 60, 70, 80)),
+    Binning("Cult", "cultural_distance", higher_is_better=False),
+)
+
+
+@dataclass(frozen=True)
+class Source:
+    path: str
+    columns: dict                 # indicator name -> column (wide format: indicator code)
+    key: str = "iso3"             # column holding the country code
+    year: str = None              # long format: column holding the year
+    wide: bool = False            # wide format: one column per year, latest non-empty wins
+    indicator: str = None         # wide format: column holding the indicator code
+
+    @classmethod
+    def from_dict(cls, spec, base="."):
+        columns = spec["columns"]
+        if isinstance(columns, (list, tuple)):
+            columns = {c: c for c in columns}
+        source = cls(os.path.join(base, spec["path"]), dict(columns), spec.get("key", "iso3"),
+                     spec.get("year"), bool(spec.get("wide", False)), spec.get("indicator"))
+        if source.wide and source.indicator is None and len(source.columns) > 1:
+            raise ValueError(f"{spec['path']}: a wide extract with several indicators needs an "
+                             f"'indicator' column (e.g. \"Indicator Code\")")
+        return source
+
+
+@dataclass(frozen=True)
+class Indicators:
+    codes: tuple
+    columns: dict                 # indicator -> float array aligned with codes (NaN = missing)
+    years: dict                   # indicator -> int array of the year each value is from
+
+
+def open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_json_array(f, size=1 << 16):
+    # Yields the elements of a top-level JSON array while reading the file
+    # in fixed-size blocks, so only one element is ever decoded at a time.
+    decoder = json.JSONDecoder()
+    buf, pos, started = "", 0, False
+    while True:
+        block = f.read(size)
+        buf = buf[pos:] + block
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if not started:
+                if pos == len(buf):
+                    break
+                if buf[pos] != "[":
+                    raise ValueError("expected a JSON array or JSON Lines")
+                started, pos = True, pos + 1
+                continue
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if not block:
+                    raise
+                break                   # element continues in the next block
+            if end == len(buf) and block:
+                break                   # a number may go on in the next block
+            yield item
+            pos = end
+        if not block:
+            return
+
+
+def iter_records(path):
+    with open_text(path) as f:
+        if ".csv" in os.path.basename(path):
+            yield from csv.DictReader(f)
+            return
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if first == "[":
+            yield from iter_json_array(_prepend(first, f))
+        else:
+            line = first + f.readline()
+            while line:
+                if line.strip():
+                    yield json.loads(line)
+                line = f.readline()
+
+
+class _prepend:
+    # Puts back the character read to sniff JSON vs JSON Lines.
+    def __init__(self, head, f):
+        self.head, self.f = head, f
+
+    def read(self, size):
+        head, self.head = self.head, ""
+        return head + self.f.read(size - len(head))
+
+
+def to_float(value):
+    if value is None or value == "" or value == "..":     # ".." is the World Bank blank
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def read_source(source, wanted=None, latest=None):
+    # Streams one extract and keeps only the latest value per country and
+    # indicator, so memory grows with countries, not rows or years.
+    latest = {} if latest is None else latest
+    # Wide extracts have one row per country and indicator; each row's
+    # indicator code picks the names it fills.
+    by_code = {}
+    for name, col in source.columns.items():
+        by_code.setdefault(str(col), []).append(name)
+    for record in iter_records(source.path):
+        code = str(record.get(source.key, "")).strip().upper()
+        if not code or (wanted and code not in wanted):
+            continue
+        if source.wide:
+            names = by_code.get(str(record.get(source.indicator, "")).strip()) if source.indicator \
+                else list(source.columns)
+            if not names:
+                continue
+            year = max((int(k) for k, v in record.items()
+                        if str(k).isdigit() and not np.isnan(to_float(v))), default=None)
+            if year is None:
+                continue
+            values = dict.fromkeys(names, to_float(record[str(year)]))
+        else:
+            year = 0
+            if source.year:
+                year = to_float(record.get(source.year))
+                if np.isnan(year):
+                    continue            # a row with no year cannot be placed against the others
+                year = int(year)
+            values = {name: to_float(record.get(col)) for name, col in source.columns.items()}
+        slot = latest.setdefault(code, {})
+        for name, value in values.items():
+            if not np.isnan(value) and (name not in slot or year >= slot[name][0]):
+                slot[name] = (year, value)
+    return latest
+
+
+def load(sources, codes=None):
+    wanted = set(codes) if codes else None
+    latest = {}
+    for source in sources:
+        read_source(source, wanted, latest)
+    codes = tuple(codes) if codes else tuple(sorted(latest))
+    names = sorted({name for source in sources for name in source.columns})
+    columns, years = {}, {}
+    for name in names:
+        pairs = [latest.get(code, {}).get(name, (0, np.nan)) for code in codes]
+        years[name] = np.array([y for y, _ in pairs], dtype=int)
+        columns[name] = np.array([v for _, v in pairs], dtype=float)
+    return Indicators(codes, columns, years)
+
+
+def load_manifest(path):
+    # {"sources": [{"path": ..., "key": ..., "year": ..., "columns": {...}}, ...]}
+    # with paths relative to the manifest; a wide source gives "wide": true
+    # and "indicator" instead of "year".
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    return [Source.from_dict(s, base) for s in spec["sources"]]
+
+
+def bin_scores(values, thresholds=None, higher_is_better=True):
+    # Vectorized 1-5 binning: np.digitize against four cut points (given, or
+    # the column's quintiles). NaN stays NaN so missing data is visible.
+    values = np.asarray(values, dtype=float)
+    if thresholds is None:
+        present = values[~np.isnan(values)]
+        if present.size == 0:
+            return np.full(values.shape, np.nan)
+        thresholds = np.quantile(present, [0.2, 0.4, 0.6, 0.8])
+    scores = (np.digitize(values, thresholds) + 1).astype(float)
+    if not higher_is_better:
+        scores = 6 - scores
+    scores[np.isnan(values)] = np.nan
+    return scores
+
+
+def score_matrix(indicators, binning=BINNING, fill=None):
+    by_criterion = {b.criterion: b for b in binning}
+    matrix = np.empty((len(indicators.codes), len(scoring.CRITERIA)))
+    for j, criterion in enumerate(scoring.CRITERIA):
+        b = by_criterion[criterion]
+        if b.indicator not in indicators.columns:
+            raise KeyError(f"no source provides {b.indicator!r} (needed for {criterion})")
+        matrix[:, j] = bin_scores(indicators.columns[b.indicator], b.thresholds, b.higher_is_better)
+    missing = np.isnan(matrix)
+    if missing.any():
+        if fill is None:
+            gaps = [f"{indicators.codes[i]}/{scoring.CRITERIA[j]}" for i, j in zip(*np.nonzero(missing))]
+            raise ValueError(f"missing indicator data for {', '.join(gaps[:10])}"
+                             f"{' ...' if len(gaps) > 10 else ''} (give a fill score to accept gaps)")
+        matrix[missing] = fill
+    return matrix
+
+
+def scoring_inputs(sources, codes=tuple(CODES), fill=None):
+    # (country names, score matrix) in the shape build_document() takes.
+    indicators = load(sources, codes)
+    names = tuple(CODES.get(code, code) for code in indicators.codes)
+    return names, score_matrix(indicators, fill=fill)
+
+
+def format_report(names, matrix):
+    lines = [f"{'Country':<12} " + " ".join(f"{c:>6}" for c in scoring.CRITERIA)]
+    for name, row in zip(names, matrix):
+        lines.append(f"{name:<12} " + " ".join(f"{v:>6.0f}" for v in row))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score markets 1-5 from indicator extracts.")
+    parser.add_argument("manifest", help="JSON file listing the CSV/JSON extracts and their columns")
+    parser.add_argument("--countries", help="comma-separated ISO3 codes (default: the case-study markets)")
+    parser.add_argument("--fill", type=float, help="score for criteria with no data (default: fail)")
+    args = parser.parse_args(argv)
+    codes = [c.strip().upper() for c in args.countries.split(",")] if args.countries else tuple(CODES)
+    try:
+        names, matrix = scoring_inputs(load_manifest(args.manifest), codes, args.fill)
+    except (KeyError, ValueError) as exc:
+        sys.exit(f"error: {exc}")
+    print(format_report(names, matrix))
+    for r in scoring.rank(names, matrix)[:3]:
+        print(f"{r.rank}. {r.country} {r.score:.2f}")
+
+
+if __name__ == "__main__":
+    main()
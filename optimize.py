@@ -0,0 +1,290 @@
+from contextlib import contextmanager, nullcontext
+import argparse
+import io
+import posixpath
+import time
+import zipfile
+
+import spans
+
+# Optimize mode: smaller files for distribution, at some extra render time.
+#   PDF:  plain Flate streams (reportlab ASCII85-wraps them by default, about
+#         +25% per stream), content streams recompressed at level 9 and
+#         identical objects merged (needs pypdf; skipped without it).
+#         TrueType fonts are already embedded as subsets by reportlab.
+#   OOXML: unused styles and optional parts (stylesWithEffects, thumbnail,
+#         printer settings) dropped, run formatting that repeats the
+#         paragraph style hoisted or removed, adjacent identical runs merged,
+#         PNGs palettized, and the zip rewritten at deflate level 9.
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+CT = "http://schemas.openxmlformats.org/package/2006/content-types"
+OPTIONAL_PARTS = ("docProps/thumbnail.jpeg", "word/stylesWithEffects.xml",
+                  "ppt/printerSettings/printerSettings1.bin")
+
+
+def w(tag):
+    return f"{{{W}}}{tag}"
+
+
+@contextmanager
+def reportlab_options(**options):
+    # rl_config is read when streams are written, so the change only has to
+    # last for one doc.build().
+    from reportlab import rl_config
+    saved = {k: getattr(rl_config, k) for k in options}
+    for k, v in options.items():
+        setattr(rl_config, k, v)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(rl_config, k, v)
+
+
+def pdf_options(enabled=True):
+    return reportlab_options(useA85=0, pageCompression=1) if enabled else nullcontext()
+
+
+def shrink_pdf_writer(writer):
+    for page in writer.pages:
+        page.compress_content_streams(level=9)
+    writer.compress_identical_objects(remove_duplicates=True, remove_unreferenced=True)
+
+
+def optimize_pdf(data):
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        return data
+    writer = PdfWriter(clone_from=PdfReader(io.BytesIO(data)))
+    shrink_pdf_writer(writer)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue() if out.tell() < len(data) else data
+
+
+def drop_part(parts, name):
+    # Remove a part together with the relationships pointing at it and its
+    # content-type override.
+    from lxml import etree
+    parts.pop(name, None)
+    for rels in [n for n in parts if n.endswith(".rels")]:
+        source = posixpath.dirname(posixpath.dirname(rels))
+        root = etree.fromstring(parts[rels])
+        hits = [r for r in root if r.get("TargetMode") != "External"
+                and posixpath.normpath(posixpath.join(source, r.get("Target"))).lstrip("/") == name]
+        if hits:
+            for r in hits:
+                root.remove(r)
+            parts[rels] = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+    root = etree.fromstring(parts["[Content_Types].xml"])
+    for o in root.findall(f"{{{CT}}}Override"):
+        if o.get("PartName").lstrip("/") == name:
+            root.remove(o)
+    parts["[Content_Types].xml"] = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def merge_runs(root, run_tag, props_tag, text_tag):
+    # Adjacent runs that carry the same formatting and only text become one.
+    from lxml import etree
+    merged = 0
+    for parent in {r.getparent() for r in root.iter(run_tag)}:
+        prev = prev_key = None
+        for run in list(parent):
+            children = list(run)
+            texts = [c for c in children if c.tag == text_tag]
+            props = [c for c in children if c.tag == props_tag]
+            if run.tag != run_tag or len(texts) != 1 or len(texts) + len(props) != len(children):
+                prev = None
+                continue
+            key = etree.tostring(props[0]) if props else b""
+            if prev is not None and key == prev_key:
+                prev_text = [c for c in prev if c.tag == text_tag][0]
+                prev_text.text = (prev_text.text or "") + (texts[0].text or "")
+                if text_tag == w("t"):
+                    prev_text.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+                parent.remove(run)
+                merged += 1
+                continue
+            prev, prev_key = run, key
+    return merged
+
+
+def _attrs_covered(run_fonts, style_fonts):
+    return style_fonts is not None and all(style_fonts.get(k) == v for k, v in run_fonts.attrib.items())
+
+
+def slim_docx_styles(document, styles, numbering=None):
+    # Run fonts that every run of a paragraph style repeats move onto the
+    # style; run fonts the style (or its base styles) already gives are
+    # dropped. Then styles nothing refers to are removed.
+    from lxml import etree
+    by_id = {s.get(w("styleId")): s for s in styles.iter(w("style"))}
+    default_p = next((s.get(w("styleId")) for s in by_id.values()
+                      if s.get(w("type")) == "paragraph" and s.get(w("default")) == "1"), None)
+
+    def style_fonts(style_id):
+        while style_id in by_id:
+            fonts = by_id[style_id].find(f"{w('rPr')}/{w('rFonts')}")
+            if fonts is not None:
+                return fonts
+            based = by_id[style_id].find(w("basedOn"))
+            style_id = based.get(w("val")) if based is not None else None
+        return None
+
+    groups = {}
+    for p in document.iter(w("p")):
+        ps = p.find(f"{w('pPr')}/{w('pStyle')}")
+        groups.setdefault(ps.get(w("val")) if ps is not None else default_p, []).append(p)
+    for style_id, paragraphs in groups.items():
+        runs = [r for p in paragraphs for r in p.iter(w("r"))]
+        fonts = [r.find(f"{w('rPr')}/{w('rFonts')}") for r in runs]
+        shapes = {etree.tostring(f) if f is not None else None for f in fonts}
+        if runs and len(shapes) == 1 and None not in shapes and style_id in by_id \
+                and not _attrs_covered(fonts[0], style_fonts(style_id)):
+            rpr = by_id[style_id].find(w("rPr"))
+            if rpr is None:
+                rpr = etree.SubElement(by_id[style_id], w("rPr"))
+            target = rpr.find(w("rFonts"))
+            if target is None:
+                target = etree.Element(w("rFonts"))
+                rpr.insert(0, target)
+            # An explicit face beats the theme font it replaces.
+            for k, v in fonts[0].attrib.items():
+                target.set(k, v)
+                target.attrib.pop(f"{k}Theme", None)
+        inherited = style_fonts(style_id)
+        for f in fonts:
+            if f is not None and _attrs_covered(f, inherited):
+                rpr = f.getparent()
+                rpr.remove(f)
+                if len(rpr) == 0:
+                    rpr.getparent().remove(rpr)
+
+    roots = [document] + ([numbering] if numbering is not None else [])
+    used = {e.get(w("val")) for root in roots for tag in ("pStyle", "rStyle", "tblStyle") for e in root.iter(w(tag))}
+    used |= {s.get(w("styleId")) for s in by_id.values() if s.get(w("default")) == "1"}
+    todo = list(used)
+    while todo:
+        style = by_id.get(todo.pop())
+        if style is None:
+            continue
+        for tag in ("basedOn", "next", "link"):
+            ref = style.find(w(tag))
+            if ref is not None and ref.get(w("val")) not in used:
+                used.add(ref.get(w("val")))
+                todo.append(ref.get(w("val")))
+    for style_id, style in by_id.items():
+        if style_id not in used:
+            styles.remove(style)
+    latent = styles.find(w("latentStyles"))
+    if latent is not None:
+        styles.remove(latent)
+
+
+def palettize_png(data):
+    from PIL import Image
+    image = Image.open(io.BytesIO(data))
+    if image.mode not in ("RGB", "RGBA", "P", "L"):
+        return data
+    out = io.BytesIO()
+    image.convert("RGB").quantize(256, method=Image.Quantize.MEDIANCUT).save(out, "PNG", optimize=True)
+    return out.getvalue() if out.tell() < len(data) else data
+
+
+def optimize_ooxml(data):
+    from lxml import etree
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        names = z.namelist()
+        parts = {n: z.read(n) for n in names}
+    for name in OPTIONAL_PARTS:
+        if name in parts:
+            drop_part(parts, name)
+
+    def parse(name):
+        return etree.fromstring(parts[name])
+
+    def store(name, root):
+        parts[name] = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+    if "word/document.xml" in parts:
+        document = parse("word/document.xml")
+        if "word/styles.xml" in parts:
+            styles = parse("word/styles.xml")
+            numbering = parse("word/numbering.xml") if "word/numbering.xml" in parts else None
+            slim_docx_styles(document, styles, numbering)
+            store("word/styles.xml", styles)
+        merge_runs(document, w("r"), w("rPr"), w("t"))
+        store("word/document.xml", document)
+    for name in [n for n in parts if n.startswith("ppt/slides/slide") and n.endswith(".xml")]:
+        root = parse(name)
+        if merge_runs(root, f"{{{A}}}r", f"{{{A}}}rPr", f"{{{A}}}t"):
+            store(name, root)
+    for name in [n for n in parts if n.endswith(".png")]:
+        parts[name] = palettize_png(parts[name])
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as z:
+        for name in [n for n in names if n in parts]:
+            z.writestr(name, parts[name])
+    return out.getvalue()
+
+
+def save_package(package, path, optimize):
+    # python-docx and python-pptx documents both save to a path or stream.
+    if not optimize:
+        package.save(path)
+        return
+    buf = io.BytesIO()
+    package.save(buf)
+    with spans.span("ooxml optimize"):
+        write_bytes(path, optimize_ooxml(buf.getvalue()))
+
+
+def write_bytes(path, data):
+    with open(path, "wb") if isinstance(path, str) else nullcontext(path) as f:
+        f.write(data)
+
+
+def measure(document, fmt, optimize):
+    import build
+    render = build.renderer(fmt)
+    buf = io.BytesIO()
+    start = time.perf_counter()
+    render(document, buf, optimize=True) if optimize else render(document, buf)
+    return len(buf.getvalue()), time.perf_counter() - start
+
+
+def report(document, formats):
+    lines = [f"{'format':<7} {'default KiB':>11} {'optimized':>10} {'saved':>7} {'default ms':>11} {'optimized':>10}"]
+    total = [0, 0]
+    for fmt in formats:
+        measure(document, fmt, False)                   # warm imports and caches
+        size, wall = measure(document, fmt, False)
+        small, small_wall = measure(document, fmt, True)
+        total[0] += size
+        total[1] += small
+        lines.append(f"{fmt:<7} {size/1024:11.1f} {small/1024:10.1f} {1 - small/size:7.1%} "
+                     f"{wall*1000:11.1f} {small_wall*1000:10.1f}")
+    lines.append(f"{'total':<7} {total[0]/1024:11.1f} {total[1]/1024:10.1f} {1 - total[1]/max(total[0], 1):7.1%}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import build
+    from case_study import build_document
+
+    parser = argparse.ArgumentParser(description="Compare default and optimized output size and render time.")
+    parser.add_argument("formats", nargs="*", metavar="FORMAT",
+                        help=f"formats to measure (default: all of {', '.join(build.RENDERERS)})")
+    args = parser.parse_args(argv)
+    unknown = [f for f in args.formats if f not in build.RENDERERS]
+    if unknown:
+        parser.error(f"unknown format {unknown[0]!r}, expected one of: {', '.join(build.RENDERERS)}")
+    print(report(build_document(), args.formats or list(build.RENDERERS)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_PATH = os.path.join(BASE, "True_Fruits_Case_Study_FINAL.pdf")
+DOCX_PATH = os.path.join(BASE, "True_Fruits_Case_Study.docx")
+PPTX_PATH = os.path.join(BASE, "True_Fruits_Presentation.pptx")
+SLIDES_PATH = os.path.join(BASE, "True_Fruits_Slides.pdf")
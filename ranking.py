@@ -0,0 +1,170 @@
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+import argparse
+
+import numpy as np
+
+import scoring
+
+
+@dataclass(frozen=True)
+class RankChange:
+    country: str
+    old_rank: int          # 1-based; 0 if the country was just added
+    new_rank: int
+    score: float
+
+
+class Ranking:
+    # Weighted totals plus a sorted list of (-total, index) keys, the same
+    # order scoring.order() gives (descending, ties in input order). A cell
+    # edit re-scores one row and moves one key: bisect finds the old and new
+    # positions in O(log n) and only the countries between them change rank.
+    # A weight edit moves every total, so it re-scores the column in one
+    # vectorized step and re-sorts the nearly sorted keys.
+
+    def __init__(self, countries=scoring.COUNTRIES, matrix=scoring.SCORES, weights=scoring.WEIGHTS, k=None):
+        self.countries = list(countries)
+        self.index = {c: i for i, c in enumerate(self.countries)}
+        self.matrix = np.array(matrix, dtype=float)
+        self.weights = np.array(weights, dtype=float)
+        self.totals = scoring.score(self.matrix, self.weights)
+        self.k = k
+        self.keys = sorted(self._key(i) for i in range(len(self.countries)))
+
+    def _key(self, i):
+        # Rounded like scoring.order() so float noise does not split ties.
+        return (-round(float(self.totals[i]), 9), i)
+
+    def _criterion(self, criterion):
+        if isinstance(criterion, int):
+            return criterion
+        try:
+            return scoring.CRITERIA.index(criterion)
+        except ValueError:
+            raise KeyError(f"unknown criterion {criterion!r}, expected one of: {', '.join(scoring.CRITERIA)}") from None
+
+    def _country(self, country):
+        try:
+            return self.index[country]
+        except KeyError:
+            raise KeyError(f"unknown country {country!r}") from None
+
+    def _watched(self, *ranks):
+        return self.k is None or min(ranks) <= self.k
+
+    def rank_of(self, country):
+        return bisect_left(self.keys, self._key(self._country(country))) + 1
+
+    def top(self, k=None):
+        k = k or self.k or len(self.keys)
+        return [scoring.Ranked(r, self.countries[i], tuple(float(v) for v in self.matrix[i]), float(self.totals[i]))
+                for r, (_, i) in enumerate(self.keys[:k], 1)]
+
+    def set_score(self, country, criterion, value):
+        i, j = self._country(country), self._criterion(criterion)
+        old_key = self._key(i)
+        self.matrix[i, j] = value
+        self.totals[i] = self.matrix[i] @ self.weights
+        new_key = self._key(i)
+        if new_key == old_key:
+            return []
+
+        old = bisect_left(self.keys, old_key)
+        del self.keys[old]
+        new = bisect_left(self.keys, new_key)
+        self.keys.insert(new, new_key)
+
+        if new == old:
+            return []
+        events = []
+        if self._watched(old + 1, new + 1):
+            events.append(RankChange(self.countries[i], old + 1, new + 1, float(self.totals[i])))
+        # Everything between the two positions shifts one place the other way.
+        shift = 1 if new < old else -1
+        lo, hi = (new + 1, old + 1) if new < old else (old, new)
+        for pos in range(lo, hi):
+            r = pos + 1
+            if self._watched(r, r - shift):
+                other = self.keys[pos][1]
+                events.append(RankChange(self.countries[other], r - shift, r, float(self.totals[other])))
+        return events
+
+    def set_weight(self, criterion, value):
+        j = self._criterion(criterion)
+        before = {i: r for r, (_, i) in enumerate(self.keys, 1)}
+        self.totals += (value - self.weights[j]) * self.matrix[:, j]
+        self.weights[j] = value
+        self.keys = sorted(self._key(i) for i in range(len(self.countries)))
+        return [RankChange(self.countries[i], before[i], r, float(self.totals[i]))
+                for r, (_, i) in enumerate(self.keys, 1)
+                if before[i] != r and self._watched(before[i], r)]
+
+    def add(self, country, row):
+        i = len(self.countries)
+        self.countries.append(country)
+        self.index[country] = i
+        self.matrix = np.vstack([self.matrix, np.asarray(row, dtype=float)])
+        self.totals = np.append(self.totals, self.matrix[i] @ self.weights)
+        key = self._key(i)
+        insort(self.keys, key)
+        new = bisect_left(self.keys, key) + 1
+        events = [RankChange(country, 0, new, float(self.totals[i]))] if self._watched(new) else []
+        for r in range(new + 1, len(self.keys) + 1):
+            if self._watched(r - 1):
+                other = self.keys[r - 1][1]
+                events.append(RankChange(self.countries[other], r - 1, r, float(self.totals[other])))
+        return events
+
+
+def format_top(ranking):
+    return "\n".join(f"{r.rank:>3}. {r.country:<14} {r.score:.2f}" for r in ranking.top())
+
+
+def format_event(e):
+    arrow = "new" if e.old_rank == 0 else ("up" if e.new_rank < e.old_rank else "down")
+    return f"  {e.country}: {e.old_rank or '-'} -> {e.new_rank} ({arrow}, {e.score:.2f})"
+
+
+def repl(ranking, lines, out=print):
+    # "<country> <criterion> <score>" edits a cell, "weight <criterion> <w>"
+    # edits a weight, "top" reprints the table.
+    out(format_top(ranking))
+    for line in lines:
+        words = line.split()
+        if not words:
+            continue
+        try:
+            if words == ["top"]:
+                out(format_top(ranking))
+                continue
+            if words[0] == "weight" and len(words) == 3:
+                events = ranking.set_weight(words[1], float(words[2]))
+            elif len(words) >= 3:
+                events = ranking.set_score(" ".join(words[:-2]), words[-2], float(words[-1]))
+            else:
+                raise ValueError("expected '<country> <criterion> <score>' or 'weight <criterion> <w>'")
+        except (KeyError, ValueError) as exc:
+            out(f"error: {exc.args[0] if exc.args else exc}")
+            continue
+        out("\n".join(map(format_event, events)) if events else "  no rank changes")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Edit scores and weights and watch the ranking move.")
+    parser.add_argument("-k", "--top", type=int, default=None, help="only report changes inside the top K")
+    parser.add_argument("--indicators", metavar="MANIFEST", help="start from scores ingested from MANIFEST")
+    args = parser.parse_args(argv)
+    countries, matrix = scoring.COUNTRIES, scoring.SCORES
+    if args.indicators:
+        import indicators
+        countries, matrix = indicators.scoring_inputs(indicators.load_manifest(args.indicators))
+    ranking = Ranking(countries, matrix, k=args.top)
+    try:
+        repl(ranking, iter(lambda: input("> "), None))
+    except (EOFError, KeyboardInterrupt):
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+import io
+import threading
+
+import build
+from build_cache import part_hashes, render_key, style_hash
+
+MIMETYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "slides": "application/pdf",
+}
+
+
+def check_format(fmt):
+    if fmt not in build.RENDERERS:
+        raise ValueError(f"unknown format {fmt!r}, expected one of: {', '.join(build.RENDERERS)}")
+
+
+def render_bytes(document, fmt="pdf"):
+    # All three backends accept a file object where they take a path.
+    check_format(fmt)
+    buf = io.BytesIO()
+    build.renderer(fmt)(document, buf)
+    return buf.getvalue()
+
+
+class RenderCache:
+    # Least-recently-used rendered outputs, bounded by their total size in
+    # bytes. Keys hash the document parts a format reads plus its renderer
+    # code and styles, so identical requests share one entry per format.
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+        self._styles = {}
+
+    def key(self, document, fmt):
+        check_format(fmt)
+        if fmt not in self._styles:
+            self._styles[fmt] = style_hash(fmt)
+        return render_key(fmt, part_hashes(document), self._styles[fmt])[0]
+
+    def get(self, key):
+        with self._lock:
+            data = self.entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def render(self, document, fmt="pdf"):
+        key = self.key(document, fmt)
+        data = self.get(key)
+        if data is None:
+            # Rendered outside the lock so other keys are not held up.
+            data = render_bytes(document, fmt)
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self.entries), "bytes": self.size, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+default_cache = RenderCache()
+
+
+def render(document, fmt="pdf", cache=default_cache):
+    # Library entry point: bytes in memory, no temp files; pass cache=None
+    # to always render.
+    if cache is None:
+        return render_bytes(document, fmt)
+    return cache.render(document, fmt)
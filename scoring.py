@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+CRITERIA = ("GDP", "Pop", "Mkt", "Prox", "Cold", "Retail", "Health", "Comp", "Ease", "Cult")
+CRITERIA_NAMES = ("GDP", "Pop", "Mkt", "Prox", "Cold", "Retail", "Health", "Comp", "Ease", "Culture")
+WEIGHTS = np.array([.15, .10, .15, .10, .10, .10, .10, .05, .10, .05])
+
+# 1-5 score per criterion for the markets True Fruits is not already in.
+COUNTRIES = ("Netherlands", "UK", "Denmark", "Sweden", "Belgium",
+             "Norway", "Italy", "Canada", "Poland", "Japan")
+SCORES = np.array([
+    [5, 3, 4, 5, 5, 5, 5, 3, 5, 5],
+    [4, 5, 5, 3, 5, 5, 5, 2, 4, 4],
+    [5, 2, 3, 4, 5, 5, 5, 4, 5, 5],
+    [4, 3, 3, 3, 5, 5, 5, 4, 5, 4],
+    [4, 2, 3, 5, 5, 5, 4, 3, 5, 4],
+    [5, 2, 3, 3, 5, 5, 5, 4, 4, 4],
+    [3, 5, 4, 4, 4, 4, 4, 3, 3, 3],
+    [4, 4, 3, 1, 5, 5, 5, 3, 5, 3],
+    [2, 4, 3, 4, 3, 4, 3, 4, 4, 3],
+    [3, 5, 3, 1, 5, 5, 4, 3, 3, 2],
+], dtype=float)
+
+
+def synthetic_markets(n, seed=0):
+    # The case markets plus random 1-5 scores up to n markets, the size of the
+    # full 192-country screen, for checks that need a long ranking.
+    rng = np.random.default_rng(seed)
+    extra = max(0, n - len(COUNTRIES))
+    countries = COUNTRIES[:n] + tuple(f"Market {i}" for i in range(len(COUNTRIES) + 1, len(COUNTRIES) + extra + 1))
+    matrix = np.vstack([SCORES[:n], rng.integers(1, 6, (extra, len(CRITERIA)))]).astype(float)
+    return countries, matrix
+
+
+@dataclass(frozen=True)
+class Ranked:
+    rank: int
+    country: str
+    criteria: tuple
+    score: float
+
+
+def score(matrix, weights=WEIGHTS):
+    # (N, C) @ (C,) -> (N,) for one weight set; (N, C) @ (C, K) -> (N, K) for
+    # K weight sets passed as a (K, C) array.
+    matrix = np.asarray(matrix, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    if matrix.ndim != 2 or weights.shape[-1] != matrix.shape[1]:
+        raise ValueError(f"weights of shape {weights.shape} do not match "
+                         f"a score matrix of shape {matrix.shape}")
+    return matrix @ weights.T
+
+
+def order(scores):
+    # Descending, ties keep input order. Rounding first stops float noise in
+    # the last bit from splitting ties such as Belgium/Norway.
+    return np.argsort(-np.round(scores, 9), kind="stable")
+
+
+def rank(countries=COUNTRIES, matrix=SCORES, weights=WEIGHTS):
+    matrix = np.asarray(matrix, dtype=float)
+    totals = score(matrix, weights)
+    return [
+        Ranked(r, countries[i], tuple(float(v) for v in matrix[i]), float(totals[i]))
+        for r, i in enumerate(order(totals), 1)
+    ]
+
+
+def weight_labels(weights=WEIGHTS, sep="\n"):
+    return [f"{c}{sep}{round(w * 100):g}%" for c, w in zip(CRITERIA, weights)]
+
+
+def formula(weights=WEIGHTS):
+    terms = " + ".join(f"({name} x {f'{w:.2f}'.lstrip('0')})"
+                       for name, w in zip(CRITERIA_NAMES, weights))
+    return f"Score = {terms}"
@@ -0,0 +1,205 @@
+from dataclasses import dataclass, field
+import argparse
+import csv
+import operator
+import time
+
+# numpy is imported where it is used, so build.py can read THRESHOLD_HELP
+# for its --help text without loading it.
+OPS = {">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt}
+
+
+@dataclass(frozen=True)
+class Filter:
+    column: str
+    op: str
+    threshold: float
+    reason: str
+
+
+@dataclass(frozen=True)
+class Round:
+    name: str
+    criteria: str
+    filters: tuple
+
+
+# Default thresholds for the three screening rounds described in Q2/slide 4.
+ROUNDS = (
+    Round("Round 1", "GDP per capita, population, political stability", (
+        Filter("gdp_per_capita", ">=", 15000, "GDP per capita too low"),
+        Filter("population", ">=", 1_000_000, "market too small"),
+        Filter("political_stability", ">=", -0.5, "politically unstable"),
+    )),
+    Round("Round 2", "Cold-chain logistics, modern retail, tariffs", (
+        Filter("cold_chain", ">=", 3.0, "no reliable cold chain"),
+        Filter("modern_retail_share", ">=", 0.5, "too little modern retail"),
+        Filter("tariff_rate", "<=", 10.0, "tariffs too high"),
+    )),
+    Round("Round 3", "Proximity, health trends, Eckes-Granini network", (
+        Filter("distance_km", "<=", 3000, "too far from Germany"),
+        Filter("health_index", ">=", 0.5, "weak health-food trend"),
+        Filter("eckes_granini", ">=", 1, "no Eckes-Granini presence"),
+    )),
+)
+
+# Counts reported in the case, used when no indicator extract is supplied.
+CASE_COUNTS = (192, 80, 50, 32)
+
+
+def filter_columns(rounds=ROUNDS):
+    return tuple(dict.fromkeys(f.column for rnd in rounds for f in rnd.filters))
+
+
+@dataclass(frozen=True)
+class IndicatorTable:
+    countries: tuple
+    columns: dict
+
+    def __len__(self):
+        return len(self.countries)
+
+    def column(self, name):
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise KeyError(f"indicator table has no column {name!r}") from None
+
+
+@dataclass
+class StageResult:
+    name: str
+    criteria: str
+    entered: int
+    survived: int
+    rejected: dict
+    seconds: float
+
+
+@dataclass
+class FunnelResult:
+    total: int
+    stages: list
+    survivors: tuple
+    rejections: dict = field(default_factory=dict)
+
+    def counts(self):
+        return (self.total,) + tuple(s.survived for s in self.stages)
+
+
+def parse_value(text, where):
+    if text in ("", None):
+        return float("nan")
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"{where}: not a number: {text!r}") from None
+
+
+def load_indicators(path, key="country", columns=None):
+    # Only the columns the filters read are parsed, so extracts can carry
+    # names, regions and other text alongside them.
+    import numpy as np
+
+    wanted = set(columns or filter_columns())
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        if key not in (reader.fieldnames or ()):
+            raise ValueError(f"{path}: no {key!r} column")
+        names = [n for n in reader.fieldnames if n in wanted]
+        countries, values = [], []
+        for line, row in enumerate(reader, 2):
+            countries.append(row[key])
+            values.append([parse_value(row[n], f"{path}:{line} {n}") for n in names])
+    matrix = np.array(values, dtype=float).reshape(len(countries), len(names))
+    return IndicatorTable(tuple(countries), {n: matrix[:, i] for i, n in enumerate(names)})
+
+
+def run_funnel(table, rounds=ROUNDS, thresholds=None):
+    # thresholds overrides Filter.threshold by column name, so an analyst can
+    # re-run the same table with e.g. {"gdp_per_capita": 20000}.
+    import numpy as np
+
+    thresholds = thresholds or {}
+    alive = np.ones(len(table), dtype=bool)
+    reason_idx = np.full(len(table), -1)
+    reasons, stages = [], []
+
+    for rnd in rounds:
+        start = time.perf_counter()
+        entered = int(alive.sum())
+        failed = np.zeros(len(table), dtype=bool)
+        rejected = {}
+        for flt in rnd.filters:
+            values = table.column(flt.column)
+            limit = thresholds.get(flt.column, flt.threshold)
+            # NaN compares False, so missing data fails the filter.
+            fails = alive & ~failed & ~OPS[flt.op](values, limit)
+            count = int(fails.sum())
+            if count:
+                rejected[flt.reason] = count
+                reason_idx[fails] = len(reasons)
+            reasons.append((rnd.name, flt.reason))
+            failed |= fails
+        alive &= ~failed
+        stages.append(StageResult(rnd.name, rnd.criteria, entered, int(alive.sum()),
+                                  rejected, time.perf_counter() - start))
+
+    rejections = {table.countries[i]: reasons[r] for i, r in enumerate(reason_idx) if r >= 0}
+    survivors = tuple(c for c, ok in zip(table.countries, alive) if ok)
+    return FunnelResult(len(table), stages, survivors, rejections)
+
+
+def parse_thresholds(items):
+    # ["column=value", ...] from the command line -> run_funnel(thresholds=...).
+    thresholds = {}
+    for item in items:
+        column, sep, value = item.partition("=")
+        if not sep or column not in filter_columns():
+            raise ValueError(f"bad threshold {item!r}: expected COLUMN=VALUE with COLUMN one of: "
+                             f"{', '.join(filter_columns())}")
+        thresholds[column] = parse_value(value, f"threshold {column}")
+    return thresholds
+
+
+def check_thresholds(thresholds):
+    unknown = set(thresholds) - set(filter_columns())
+    if unknown:
+        raise ValueError(f"unknown screening column(s): {', '.join(sorted(unknown))}")
+    return {k: float(v) for k, v in thresholds.items()}
+
+
+def format_report(result):
+    lines = [f"{'Stage':<8} {'In':>5} {'Out':>5} {'ms':>8}  Rejected"]
+    for s in result.stages:
+        why = ", ".join(f"{r} ({n})" for r, n in sorted(s.rejected.items(), key=lambda kv: -kv[1]))
+        lines.append(f"{s.name:<8} {s.entered:>5} {s.survived:>5} {s.seconds*1000:8.3f}  {why or '-'}")
+    lines.append(f"{len(result.survivors)} survivors: {', '.join(result.survivors)}")
+    return "\n".join(lines)
+
+
+THRESHOLD_HELP = "override a screening threshold (repeatable), e.g. gdp_per_capita=20000"
+
+
+def funnel_from_args(parser, args):
+    # For entry points with --screen CSV and --threshold COLUMN=VALUE.
+    if not args.screen:
+        if args.threshold:
+            parser.error("--threshold needs --screen")
+        return None
+    try:
+        return run_funnel(load_indicators(args.screen), thresholds=parse_thresholds(args.threshold))
+    except (KeyError, ValueError) as exc:
+        parser.exit(2, f"error: {exc.args[0] if exc.args else exc}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the market-screening funnel on an indicator CSV.")
+    parser.add_argument("screen", metavar="CSV", help="one row per country, one column per indicator")
+    parser.add_argument("--threshold", action="append", default=[], metavar="COLUMN=VALUE", help=THRESHOLD_HELP)
+    args = parser.parse_args(argv)
+    print(format_report(funnel_from_args(parser, args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+import argparse
+import time
+
+import numpy as np
+
+import scoring
+
+
+@dataclass(frozen=True)
+class Sensitivity:
+    countries: tuple
+    draws: int
+    k: int
+    concentration: float
+    base_rank: tuple
+    first: tuple          # share of draws where the country ranks #1
+    top_k: tuple          # share of draws where the country is in the top k
+    seconds: float
+
+    def rows(self):
+        order = sorted(range(len(self.countries)), key=lambda i: (-self.top_k[i], self.base_rank[i]))
+        return [(self.countries[i], self.base_rank[i], self.first[i], self.top_k[i]) for i in order]
+
+
+def sample_weights(n, weights=scoring.WEIGHTS, concentration=200.0, rng=None):
+    # Dirichlet around the current weights: gamma draws normalized per row.
+    # Higher concentration keeps draws closer to the base weights.
+    rng = rng or np.random.default_rng()
+    g = rng.standard_gamma(np.asarray(weights) * concentration, size=(n, len(weights)))
+    return (g / g.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def run(countries=scoring.COUNTRIES, matrix=scoring.SCORES, weights=scoring.WEIGHTS,
+        draws=100_000, k=3, concentration=200.0, chunk=65_536, seed=0):
+    start = time.perf_counter()
+    matrix = np.asarray(matrix, dtype=np.float32)
+    n = matrix.shape[0]
+    k = min(k, n)
+    rng = np.random.default_rng(seed)
+    first = np.zeros(n, dtype=np.int64)
+    top = np.zeros(n, dtype=np.int64)
+
+    # Work in chunks of draws so memory stays at chunk x n scores however
+    # many draws are requested.
+    for offset in range(0, draws, chunk):
+        m = min(chunk, draws - offset)
+        scores = sample_weights(m, weights, concentration, rng) @ matrix.T      # (m, n)
+        first += np.bincount(scores.argmax(axis=1), minlength=n)
+        if k < n:
+            idx = np.argpartition(scores, n - k, axis=1)[:, n - k:]
+            top += np.bincount(idx.ravel(), minlength=n)
+        else:
+            top += m
+
+    base = np.empty(n, dtype=int)
+    base[scoring.order(scoring.score(np.asarray(matrix, dtype=float), weights))] = np.arange(1, n + 1)
+    return Sensitivity(
+        tuple(countries), draws, k, concentration, tuple(int(r) for r in base),
+        tuple(float(v) for v in first / max(draws, 1)),
+        tuple(float(v) for v in top / max(draws, 1)),
+        time.perf_counter() - start,
+    )
+
+
+def format_report(result, limit=None):
+    lines = [f"{result.draws:,} weight draws, top {result.k}, "
+             f"concentration {result.concentration:g}, {result.seconds:.2f} s",
+             f"{'Country':<14} {'Base':>4} {'P(#1)':>7} {f'P(top {result.k})':>9}"]
+    for country, base, p1, pk in result.rows()[:limit]:
+        lines.append(f"{country:<14} {base:>4} {p1:7.1%} {pk:9.1%}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo sensitivity of the country ranking to the weights.")
+    parser.add_argument("--draws", type=int, default=100_000)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--concentration", type=float, default=200.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(format_report(run(draws=args.draws, k=args.k,
+                            concentration=args.concentration, seed=args.seed)))
+
+
+if __name__ == "__main__":
+    main()
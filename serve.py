@@ -0,0 +1,274 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import batch
+import build
+import rendering
+
+CHUNK = 64 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           408: "Request Timeout", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+           504: "Gateway Timeout"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status, self.headers = status, dict(headers)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+class RenderService:
+    # Documents are built in the event loop (a few ms of pure Python) so the
+    # cache key is known before anything is queued; only rendering goes to
+    # the process pool. At most workers + queue_size renders are admitted at
+    # once, identical concurrent requests share one render, and everything
+    # beyond that is refused with 503 instead of piling up. A worker that dies
+    # (OOM kill, segfault) breaks the whole pool, so a broken pool is
+    # replaced and the renders that were on it get 503.
+
+    def __init__(self, workers=None, queue_size=32, timeout=30.0, cache_bytes=256 * 2**20,
+                 header_timeout=10.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.limit = self.workers + queue_size
+        self.timeout = timeout
+        self.header_timeout = header_timeout
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.cache = rendering.RenderCache(cache_bytes)
+        self.inflight = {}
+        self.latencies = deque(maxlen=2048)
+        self.started = time.time()
+        self.served = self.rejected = self.timeouts = self.failed = self.restarts = 0
+
+    def restart_pool(self, broken):
+        # Several renders fail together when a pool breaks; only the first
+        # to notice replaces it.
+        if self.pool is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            self.restarts += 1
+
+    def submit(self, document, fmt):
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        try:
+            future = loop.run_in_executor(pool, rendering.render_bytes, document, fmt)
+        except BrokenProcessPool:
+            self.restart_pool(pool)
+            pool = self.pool
+            future = loop.run_in_executor(pool, rendering.render_bytes, document, fmt)
+        return asyncio.ensure_future(future), pool
+
+    async def render(self, scenario, fmt):
+        try:
+            document = batch.scenario_document(scenario)
+        except (TypeError, ValueError) as exc:
+            raise HTTPError(400, str(exc)) from None
+        key = self.cache.key(document, fmt)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+
+        task = self.inflight.get(key)
+        if task is None:
+            if len(self.inflight) >= self.limit:
+                self.rejected += 1
+                raise HTTPError(503, "render queue is full, retry shortly", {"Retry-After": "1"})
+            task, pool = self.submit(document, fmt)
+            self.inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t, pool))
+        try:
+            # shield(): one client timing out must not cancel a render that
+            # other clients are waiting on.
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise HTTPError(504, f"render took longer than {self.timeout:g} s") from None
+        except BrokenProcessPool:
+            raise HTTPError(503, "a render worker died, retry shortly", {"Retry-After": "1"}) from None
+
+    def _finished(self, key, task, pool):
+        self.inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.cache.put(key, task.result())
+        else:
+            self.failed += 1
+            if not task.cancelled() and isinstance(task.exception(), BrokenProcessPool):
+                self.restart_pool(pool)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "workers": self.workers,
+            "queue_depth": max(0, len(self.inflight) - self.workers),
+            "in_flight": len(self.inflight),
+            "limit": self.limit,
+            "served": self.served,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failed": self.failed,
+            "pool_restarts": self.restarts,
+            "latency_ms": {f"p{q}": (round(percentile(latencies, q) * 1000, 1) if latencies else None)
+                           for q in (50, 90, 99)},
+            "cache": self.cache.stats(),
+            "uptime_s": round(time.time() - self.started, 1),
+        }
+
+    async def handle(self, method, target, body):
+        url = urlsplit(target)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["health"]:
+            return 200, "application/json", b'{"ok": true}'
+        if parts == ["stats"]:
+            return 200, "application/json", json.dumps(self.stats(), indent=1).encode()
+        if len(parts) != 2 or parts[0] != "render":
+            raise HTTPError(404, f"no route for {url.path}")
+        fmt = parts[1]
+        if fmt not in build.RENDERERS:
+            raise HTTPError(404, f"unknown format {fmt!r}, expected one of: {', '.join(build.RENDERERS)}")
+
+        if method == "GET":
+            query = parse_qs(url.query)
+            scenario = {}
+            if "company" in query:
+                scenario["company"] = query["company"][-1]
+            if "countries" in query:
+                scenario["countries"] = query["countries"][-1].split(",")
+            if "weights" in query:
+                try:
+                    scenario["weights"] = [float(w) for w in query["weights"][-1].split(",")]
+                except ValueError:
+                    raise HTTPError(400, "weights must be comma-separated numbers") from None
+        elif method == "POST":
+            try:
+                scenario = json.loads(body or b"{}")
+            except ValueError as exc:
+                raise HTTPError(400, f"invalid JSON: {exc}") from None
+            if not isinstance(scenario, dict):
+                raise HTTPError(400, "expected a JSON object describing one scenario")
+        else:
+            raise HTTPError(405, f"{method} not allowed", {"Allow": "GET, POST"})
+
+        start = time.perf_counter()
+        data = await self.render(scenario, fmt)
+        self.latencies.append(time.perf_counter() - start)
+        self.served += 1
+        return 200, rendering.MIMETYPES[fmt], data
+
+    async def connection(self, reader, writer):
+        try:
+            try:
+                # A client that opens a connection and never finishes its
+                # headers would otherwise hold it open for good.
+                try:
+                    request = await asyncio.wait_for(read_request(reader), self.header_timeout)
+                except asyncio.TimeoutError:
+                    raise HTTPError(408, f"request not received within {self.header_timeout:g} s") from None
+                if request is None:
+                    return
+                status, ctype, data = await self.handle(*request)
+                headers = {}
+            except HTTPError as exc:
+                status, ctype, headers = exc.status, "application/json", exc.headers
+                data = json.dumps({"error": str(exc)}).encode()
+            except Exception as exc:
+                status, ctype, headers = 500, "application/json", {}
+                data = json.dumps({"error": f"{type(exc).__name__}: {exc}"}).encode()
+            await send(writer, status, ctype, data, headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def read_request(reader, max_body=1 << 20):
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        return None
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            try:
+                length = int(value.strip() or 0)
+            except ValueError:
+                raise HTTPError(400, "invalid Content-Length") from None
+    if length > max_body:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, body
+
+
+async def send(writer, status, ctype, data, headers):
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Type: {ctype}",
+            f"Content-Length: {len(data)}", "Connection: close"]
+    head += [f"{k}: {v}" for k, v in headers.items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+    # Stream in chunks and wait for the socket to drain, so a slow client
+    # holds back its own response rather than buffering it all in memory.
+    view = memoryview(data)
+    for i in range(0, len(view), CHUNK):
+        writer.write(view[i:i + CHUNK])
+        await writer.drain()
+    await writer.drain()
+
+
+def warm_worker():
+    for fmt in build.RENDERERS:
+        build.renderer(fmt)
+
+
+async def serve(host="127.0.0.1", port=8000, **options):
+    service = RenderService(**options)
+    # Import the backends in every worker before taking requests, so the
+    # first burst does not pay for it.
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(service.pool, warm_worker) for _ in range(service.workers)))
+    server = await asyncio.start_server(service.connection, host, port, backlog=256)
+    print(f"serving on http://{host}:{port}  ({service.workers} workers, "
+          f"{service.limit} concurrent renders, {service.timeout:g} s timeout)", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the case study as PDF/DOCX/PPTX over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-j", "--workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--queue", type=int, default=32, help="renders allowed to wait for a worker")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds before a request gets 504")
+    parser.add_argument("--header-timeout", type=float, default=10.0,
+                        help="seconds a client has to send its request before it gets 408")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, queue_size=args.queue,
+                          timeout=args.timeout, header_timeout=args.header_timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import ast
+import importlib
+import os
+import sys
+import time
+import traceback
+
+import build
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+
+
+
+def local_imports(name):
+    # Modules of this directory that name imports, at the top or inside a
+    # function (the CLI and the renderers import lazily).
+    with open(os.path.join(BASE, f"{name}.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    found = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            found.append(node.module)
+    return [n for n in dict.fromkeys(found) if os.path.exists(os.path.join(BASE, f"{n}.py"))]
+
+
+def dependency_order(roots):
+    # Depth first, so every module comes after the modules it imports.
+    order = []
+
+    def visit(name, stack):
+        if name in order or name in stack:
+            return
+        for dep in local_imports(name):
+            visit(dep, stack | {name})
+        order.append(name)
+
+    for name in roots:
+        visit(name, set())
+    return order
+
+
+# Watched modules in import-dependency order: when one changes, it and every
+# module after it are reloaded so nobody keeps a stale class or function.
+# Taken from build's import graph plus the renderers it loads by name, so a
+# new module is watched as soon as the build uses it.
+MODULES = dependency_order(["build", *(m for m, _, _ in build.RENDERERS.values())])
+
+
+def snapshot(paths):
+    stamps = {}
+    for path in paths:
+        try:
+            stamps[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            stamps[path] = None
+    return stamps
+
+
+def reload_from(first):
+    for name in MODULES[MODULES.index(first):]:
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+
+
+def make_document(indicators=None):
+    case_study = sys.modules["case_study"]
+    funnel = None
+    if indicators:
+        screening = sys.modules["screening"]
+        funnel = screening.run_funnel(screening.load_indicators(indicators))
+    return case_study.build_document(funnel=funnel)
+
+
+def watch(formats=None, indicators=None, interval=0.2):
+    formats = list(formats or build.RENDERERS)
+    # Pay for interpreter start, library imports and font loading once.
+    for name in MODULES:
+        importlib.import_module(name)
+    for fmt in formats:
+        build.renderer(fmt)
+
+    sources = {os.path.join(BASE, f"{name}.py"): name for name in MODULES}
+    paths = list(sources) + ([os.path.abspath(indicators)] if indicators else [])
+    stamps = snapshot(paths)
+    build.build_all(make_document(indicators), formats, parallel=False)
+    print(f"watching {len(paths)} files, Ctrl-C to stop", flush=True)
+
+    while True:
+        time.sleep(interval)
+        current = snapshot(paths)
+        changed = [p for p in paths if current[p] != stamps[p]]
+        if not changed:
+            continue
+        stamps = current
+        start = time.perf_counter()
+        print(f"\nchanged: {', '.join(os.path.basename(p) for p in changed)}", flush=True)
+        try:
+            touched = [sources[p] for p in changed if p in sources]
+            if touched:
+                reload_from(min(touched, key=MODULES.index))
+            build.build_all(make_document(indicators), formats, parallel=False)
+        except Exception:
+            traceback.print_exc()
+            print("rebuild failed, waiting for the next save", flush=True)
+            continue
+        print(f"rebuilt in {(time.perf_counter() - start)*1000:.0f} ms", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild outputs on save from a warm resident process.")
+    parser.add_argument("formats", nargs="*", metavar="FORMAT",
+                        help=f"formats to keep up to date: {', '.join(build.RENDERERS)} (default: all)")
+    parser.add_argument("--indicators", metavar="CSV", help="indicator extract to screen and watch")
+    parser.add_argument("--interval", type=float, default=0.2, help="polling interval in seconds")
+    args = parser.parse_args(argv)
+    unknown = set(args.formats) - set(build.RENDERERS)
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(sorted(unknown))}")
+    try:
+        watch(args.formats, args.indicators, args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()